@@ -4,30 +4,50 @@
 from __future__ import annotations
 
 import asyncio
-import json
+from functools import partial
 import logging
 import uuid
 from subprocess import run
 
-import aiofiles
 from aiohttp import web
 from attr import dataclass
+import voluptuous as vol
 from TISControlProtocol.api import TISApi
-from TISControlProtocol.Protocols.udp.ProtocolHandler import (
-    TISPacket,
-    TISProtocolHandler,
-)
 
 from homeassistant.components.http import HomeAssistantView
-from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import Platform
-from homeassistant.core import HomeAssistant
-
-from .const import DEVICES_DICT, DOMAIN
+from homeassistant.config_entries import ConfigEntry, ConfigEntryState
+from homeassistant.const import ATTR_ENTITY_ID, STATE_OFF, STATE_ON, Platform
+from homeassistant.core import HomeAssistant, ServiceCall
+import homeassistant.helpers.config_validation as cv
+from homeassistant.helpers.entity_platform import async_get_platforms
+from homeassistant.helpers.json import json_bytes
+
+from .ack_tracker import TISAckTracker
+from .appliances import TISApplianceSync, appliance_snapshot, appliance_store
+from .const import (
+    CONF_ADAPTIVE_POLLING,
+    DEVICES_DICT,
+    DOMAIN,
+    SERVICE_BULK_CONTROL,
+)
+from .control import async_bulk_control
+from .coordinator import TISHealthCoordinator
+from .discovery import TISDeviceInventory
+from .dispatcher import TISDispatcher
+from .entities import OptimisticStats, WriteStats
+from .gateways import TISGatewaySender
+from .liveness import TISLiveness
+from .packets import clear_update_packets
+from .state_sync import TISStateSync
 
 PLATFORMS: list[Platform] = [Platform.LIGHT, Platform.SENSOR, Platform.SWITCH, Platform.COVER, Platform.CLIMATE, Platform.SELECT, Platform.LOCK]
 type TISConfigEntry = ConfigEntry[TISData]
-protocol_handler = TISProtocolHandler()
+BULK_CONTROL_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_ENTITY_ID): cv.entity_ids,
+        vol.Required("state"): vol.In([STATE_ON, STATE_OFF]),
+    }
+)
 
 
 @dataclass
@@ -35,6 +55,16 @@ class TISData:
     """TISControl data stored in the ConfigEntry."""
 
     api: TISApi
+    dispatcher: TISDispatcher
+    ack_tracker: TISAckTracker
+    optimistic_stats: OptimisticStats
+    state_sync: TISStateSync
+    health_coordinator: TISHealthCoordinator
+    write_stats: WriteStats
+    liveness: TISLiveness
+    gateway_sender: TISGatewaySender
+    appliances: TISApplianceSync
+    device_inventory: TISDeviceInventory
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: TISConfigEntry) -> bool:
@@ -51,22 +81,83 @@ async def async_setup_entry(hass: HomeAssistant, entry: TISConfigEntry) -> bool:
         domain=DOMAIN,
         devices_dict=DEVICES_DICT,
     )
-    entry.runtime_data = TISData(api=tis_api)
+    gateway_sender = TISGatewaySender(hass, tis_api)
+    liveness = TISLiveness(hass, tis_api, gateway_sender, entry.entry_id)
+    dispatcher = TISDispatcher(hass, liveness)
+    entry.runtime_data = TISData(
+        api=tis_api,
+        dispatcher=dispatcher,
+        ack_tracker=TISAckTracker(tis_api, gateway_sender, liveness),
+        optimistic_stats=OptimisticStats(),
+        state_sync=TISStateSync(
+            hass, tis_api, dispatcher, gateway_sender, liveness
+        ),
+        health_coordinator=TISHealthCoordinator(
+            hass,
+            tis_api,
+            dispatcher,
+            gateway_sender,
+            adaptive=entry.options.get(CONF_ADAPTIVE_POLLING, False),
+        ),
+        write_stats=WriteStats(),
+        liveness=liveness,
+        gateway_sender=gateway_sender,
+        appliances=TISApplianceSync(hass, tis_api, entry.entry_id),
+        device_inventory=TISDeviceInventory(hass, tis_api, gateway_sender),
+    )
 
     hass.data.setdefault(DOMAIN, {"supported_platforms": PLATFORMS})
     try:
         await tis_api.connect()
         hass.http.register_view(TISEndPoint(tis_api))
-        hass.http.register_view(ScanDevicesEndPoint(tis_api))
+        hass.http.register_view(
+            ScanDevicesEndPoint(entry.runtime_data.device_inventory)
+        )
         hass.http.register_view(GetKeyEndpoint(tis_api))
     except ConnectionError as e:
         logging.error("error connecting to TIS api %s", e)
         return False
+    # route TIS feedback through a single listener for this entry
+    entry.async_on_unload(dispatcher.async_setup())
+    entry.async_on_unload(entry.runtime_data.state_sync.async_stop)
+    entry.async_on_unload(entry.runtime_data.health_coordinator.async_stop)
+    entry.async_on_unload(liveness.async_stop)
+    entry.async_on_unload(gateway_sender.async_stop)
+    entry.async_on_unload(entry.runtime_data.device_inventory.async_stop)
+    entry.async_on_unload(partial(clear_update_packets, tis_api))
+    entry.async_on_unload(entry.add_update_listener(async_update_options))
     # add the tis api to the hass data
+    await entry.runtime_data.appliances.async_load()
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    if not hass.services.has_service(DOMAIN, SERVICE_BULK_CONTROL):
+        hass.services.async_register(
+            DOMAIN,
+            SERVICE_BULK_CONTROL,
+            partial(async_handle_bulk_control, hass),
+            schema=BULK_CONTROL_SCHEMA,
+        )
     return True
 
 
+async def async_update_options(hass: HomeAssistant, entry: TISConfigEntry) -> None:
+    """Apply options that are not read live by the entities."""
+    entry.runtime_data.health_coordinator.async_set_adaptive(
+        entry.options.get(CONF_ADAPTIVE_POLLING, False)
+    )
+
+
+async def async_handle_bulk_control(hass: HomeAssistant, call: ServiceCall) -> None:
+    """Switch a set of TIS entities on or off in one batch."""
+    entity_ids = set(call.data[ATTR_ENTITY_ID])
+    entities = [
+        entity
+        for platform in async_get_platforms(hass, DOMAIN)
+        for entity_id, entity in platform.entities.items()
+        if entity_id in entity_ids and hasattr(entity, "generate_state_packet")
+    ]
+    await async_bulk_control(entities, call.data["state"] == STATE_ON)
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: TISConfigEntry) -> bool:
     """Unload a config entry."""
     if unload_ok := await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
@@ -75,6 +166,11 @@ async def async_unload_entry(hass: HomeAssistant, entry: TISConfigEntry) -> bool
     return False
 
 
+async def async_remove_entry(hass: HomeAssistant, entry: TISConfigEntry) -> None:
+    """Remove the appliance snapshot of a deleted config entry."""
+    await appliance_store(hass, entry.entry_id).async_remove()
+
+
 class TISEndPoint(HomeAssistantView):
     """TIS API endpoint."""
 
@@ -90,21 +186,25 @@ class TISEndPoint(HomeAssistantView):
         """Handle the device publishing post request from the addon."""
         # Parse the JSON data from the request
         data = await request.json()
-        # dump to file
-        async with aiofiles.open("appliance_data.json", "w", encoding="utf-8") as f:
-            await f.write(json.dumps(data, indent=4))
 
-        # Start reload operations in the background
-        _ = asyncio.create_task(self.reload_platforms())  # noqa: RUF006
+        # Apply and store the changes the changes in the background
+        _ = asyncio.create_task(self.apply_appliances(data))  # noqa: RUF006
 
         # Return the response immediately
         return web.json_response({"message": "success"})
 
-    async def reload_platforms(self):
-        """Reload the platforms."""
-        # Reload the platforms
-        for entry in self.api.hass.config_entries.async_entries(self.api.domain):
-            await self.api.hass.config_entries.async_reload(entry.entry_id)
+    async def apply_appliances(self, data: dict) -> None:
+        """Add, remove or rebuild only the entities whose appliance changed."""
+        hass = self.api.hass
+        for entry in hass.config_entries.async_entries(DOMAIN):
+            if entry.state is ConfigEntryState.LOADED:
+                await entry.runtime_data.appliances.async_apply(data)
+            else:
+                # not set up yet: store the push for the setup to load
+                await appliance_store(hass, entry.entry_id).async_save(
+                    appliance_snapshot(data)
+                )
+                await hass.config_entries.async_reload(entry.entry_id)
 
 
 class ScanDevicesEndPoint(HomeAssistantView):
@@ -114,38 +214,30 @@ class ScanDevicesEndPoint(HomeAssistantView):
     name = "api:scan_devices"
     requires_auth = False
 
-    def __init__(self, tis_api: TISApi) -> None:
+    def __init__(self, inventory: TISDeviceInventory) -> None:
         """Initialize the API endpoint."""
-        self.api = tis_api
-        self.discovery_packet: TISPacket = protocol_handler.generate_discovery_packet()
+        self.inventory = inventory
 
     async def get(self, request):
-        """Handle the get request."""
-        # Discover network devices
-        devices = await self.discover_network_devices()
-        devices = [
-            {
-                "device_id": device["device_id"],
-                "device_type_code": device["device_type"],
-                "device_type_name": self.api.devices_dict.get(
-                    tuple(device["device_type"]), tuple(device["device_type"])
-                ),
-                "gateway": device["source_ip"],
-            }
-            for device in devices
-        ]
-        return web.json_response(devices)
-
-    async def discover_network_devices(self, prodcast_attempts=10) -> list:
-        """Discover TIS devices on network."""
-        # empty current discovered devices list
-        self.api.hass.data[self.api.domain]["discovered_devices"] = []
-        for _ in range(prodcast_attempts):
-            await self.api.protocol.sender.broadcast_packet(self.discovery_packet)
-            await asyncio.sleep(1)
-
-        return self.api.hass.data[self.api.domain]["discovered_devices"]
-
+        """Return the device inventory, refreshing it in the background.
+
+        The first scan, while the inventory is still empty, streams the
+        devices as a JSON array as they reply.
+        """
+        await self.inventory.async_load()
+        if self.inventory.devices:
+            self.inventory.async_refresh()
+            return web.json_response(list(self.inventory.devices.values()))
+        response = web.StreamResponse(headers={"Content-Type": "application/json"})
+        response.enable_chunked_encoding()
+        await response.prepare(request)
+        separator = b"["
+        async for device in self.inventory.async_scan():
+            await response.write(separator + json_bytes(device))
+            separator = b","
+        await response.write(b"[]" if separator == b"[" else b"]")
+        await response.write_eof()
+        return response
 
 class GetKeyEndpoint(HomeAssistantView):
     """Get Key API endpoint."""
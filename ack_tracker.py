@@ -0,0 +1,169 @@
+"""Pipelined ACK tracking on top of the gateway send queues."""
+
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass, field
+import logging
+from typing import TYPE_CHECKING, Any
+
+from TISControlProtocol.api import TISApi
+from TISControlProtocol.Protocols.udp.ProtocolHandler import TISPacket
+
+from .const import ACK_BACKOFF, ACK_RETRIES, ACK_TIMEOUT, ACK_WINDOW
+from .dispatcher import pack_device_id
+from .gateways import SendPriority, TISGatewaySender
+
+if TYPE_CHECKING:
+    from .liveness import TISLiveness
+
+_LOGGER = logging.getLogger(__name__)
+
+AckKey = tuple[tuple[int, ...], tuple[int, ...], int | None]
+
+
+def ack_key(packet: TISPacket) -> AckKey:
+    """Return the (device, operation, channel) key a reply is matched on."""
+    additional_bytes = packet.additional_bytes
+    return (
+        tuple(packet.device_id),
+        tuple(packet.operation_code),
+        additional_bytes[0] if additional_bytes else None,
+    )
+
+
+@dataclass(slots=True)
+class GatewayWindow:
+    """In-flight bookkeeping for one gateway."""
+
+    size: int
+    in_flight: int = 0
+    pending: int = 0
+    acked: int = 0
+    failed: int = 0
+    retries: int = 0
+    condition: asyncio.Condition = field(default_factory=asyncio.Condition)
+    key_locks: dict[AckKey, asyncio.Lock] = field(default_factory=dict)
+    key_users: dict[AckKey, int] = field(default_factory=dict)
+
+    @property
+    def queue_depth(self) -> int:
+        """Return the number of packets waiting for a slot."""
+        return self.pending - self.in_flight
+
+
+class TISAckTracker:
+    """Send packets with ACK through a bounded in-flight window per gateway.
+
+    At most `size` packets await an ACK toward one gateway at a time, the
+    rest queue, so a slow or dead gateway only holds back its own packets.
+    Only one packet per (device, operation, channel) key is in
+    flight, so every reply maps to exactly one request. Packets that time
+    out are retried with exponential backoff. First attempts are queued as
+    control traffic and retries as ACK retries on the gateway sender, so
+    they go ahead of status and poll packets.
+    Devices the liveness tracker knows to be offline are not sent to, and
+    packets that stay unacknowledged are reported to it.
+    """
+
+    def __init__(
+        self,
+        api: TISApi,
+        gateways: TISGatewaySender,
+        liveness: TISLiveness,
+        window: int = ACK_WINDOW,
+        timeout: float = ACK_TIMEOUT,
+        retries: int = ACK_RETRIES,
+        backoff: float = ACK_BACKOFF,
+    ) -> None:
+        """Initialize the tracker."""
+        self.api = api
+        self.gateways = gateways
+        self.liveness = liveness
+        self.window = window
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self._gateways: dict[str, GatewayWindow] = {}
+
+    def _gateway(self, gateway: str) -> GatewayWindow:
+        """Return the window of a gateway, creating it on first use."""
+        if (state := self._gateways.get(gateway)) is None:
+            state = self._gateways[gateway] = GatewayWindow(size=self.window)
+        return state
+
+    def set_window(self, gateway: str, size: int) -> None:
+        """Change how many packets may be in flight toward a gateway."""
+        self._gateway(gateway).size = max(1, size)
+
+    async def send_packet_with_ack(self, packet: TISPacket) -> bool:
+        """Send a packet and return whether it was acknowledged."""
+        device_address = pack_device_id(packet.device_id)
+        if not self.liveness.is_available(device_address):
+            _LOGGER.debug("Not sending to offline device %#06x", device_address)
+            return False
+        state = self._gateway(packet.destination_ip)
+        key = ack_key(packet)
+        state.pending += 1
+        state.key_users[key] = state.key_users.get(key, 0) + 1
+        key_lock = state.key_locks.setdefault(key, asyncio.Lock())
+        try:
+            async with key_lock:
+                ack_status = await self._send_with_retries(state, packet)
+        finally:
+            state.pending -= 1
+            state.key_users[key] -= 1
+            if not state.key_users[key]:
+                del state.key_users[key]
+                del state.key_locks[key]
+        if ack_status:
+            state.acked += 1
+            self.liveness.async_seen(device_address)
+        else:
+            state.failed += 1
+            self.liveness.async_failed(packet)
+        return ack_status
+
+    async def _send_with_retries(self, state: GatewayWindow, packet: TISPacket) -> bool:
+        """Send a packet, retrying with backoff until ACKed or out of tries."""
+        coordinator = self.api.protocol.coordinator
+        key = ack_key(packet)
+        for attempt in range(self.retries + 1):
+            async with state.condition:
+                await state.condition.wait_for(lambda: state.in_flight < state.size)
+                state.in_flight += 1
+            # the protocol sets the event when the matching reply arrives
+            ack = coordinator.create_ack_event(key)
+            try:
+                self.gateways.async_send(
+                    packet, SendPriority.RETRY if attempt else SendPriority.CONTROL
+                )
+                async with asyncio.timeout(self.timeout):
+                    await ack.wait()
+                return True
+            except TimeoutError:
+                _LOGGER.debug("ACK timeout for %s", key)
+            finally:
+                coordinator.remove_ack_event(key)
+                async with state.condition:
+                    state.in_flight -= 1
+                    state.condition.notify()
+            if attempt < self.retries:
+                state.retries += 1
+                await asyncio.sleep(self.backoff * 2**attempt)
+        return False
+
+    @property
+    def stats(self) -> dict[str, dict[str, Any]]:
+        """Return the window, queue and ACK counters of each gateway."""
+        return {
+            gateway: {
+                "window": state.size,
+                "in_flight": state.in_flight,
+                "queue_depth": state.queue_depth,
+                "acked": state.acked,
+                "failed": state.failed,
+                "retries": state.retries,
+            }
+            for gateway, state in self._gateways.items()
+        }
@@ -0,0 +1,251 @@
+"""Catalogue of TIS appliances and its incremental sync with the addon."""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from dataclasses import dataclass, field
+import hashlib
+import logging
+import time
+from typing import Any
+
+import orjson
+from TISControlProtocol.api import TISApi
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.entity import Entity
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.storage import Store
+
+from .const import APPLIANCE_STORE_VERSION, DOMAIN
+from .dispatcher import pack_device_id
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class Appliance:
+    """The parts of an appliance's config its entity is built from."""
+
+    name: str
+    appliance_type: str
+    device_id: list[int]
+    gateway: str
+    channels: tuple[int, ...]
+    is_protected: bool
+
+
+ApplianceBuilder = Callable[[TISApi, Appliance], Entity]
+
+
+class ApplianceCatalogue:
+    """The appliances of a config entry, indexed by type and by device.
+
+    Built once from the appliances the API parsed, so platforms look up
+    their appliances without reading or parsing the appliance file again.
+    Appliances missing a device, gateway or channel are logged and left out.
+    """
+
+    def __init__(self, config_entries: dict[str, Any]) -> None:
+        """Index the parsed appliances."""
+        self._by_type: dict[str, dict[str, Appliance]] = {}
+        self._by_device: dict[tuple[str, int], list[Appliance]] = {}
+        for appliance_type, groups in config_entries.items():
+            if not isinstance(groups, list):
+                # lock module, passwords and other non appliance settings
+                continue
+            for group in groups:
+                for name, details in group.items():
+                    try:
+                        appliance = Appliance(
+                            name,
+                            appliance_type,
+                            list(details["device_id"]),
+                            details["gateway"],
+                            tuple(
+                                int(channel["channel_number"])
+                                for channel in details["channels"]
+                            ),
+                            details["is_protected"],
+                        )
+                    except (KeyError, TypeError, ValueError) as err:
+                        _LOGGER.warning("Skipping invalid appliance %s: %s", name, err)
+                        continue
+                    if not appliance.channels:
+                        _LOGGER.warning("Skipping appliance %s without channels", name)
+                        continue
+                    self._by_type.setdefault(appliance_type, {})[name] = appliance
+                    self._by_device.setdefault(
+                        (appliance.gateway, pack_device_id(appliance.device_id)), []
+                    ).append(appliance)
+
+    def of_type(self, appliance_type: str) -> dict[str, Appliance]:
+        """Return the appliances of a type, keyed by name."""
+        return self._by_type.get(appliance_type, {})
+
+    def on_device(self, gateway: str, device_id: list[int]) -> list[Appliance]:
+        """Return the appliances of a device."""
+        return self._by_device.get((gateway, pack_device_id(device_id)), [])
+
+    def __len__(self) -> int:
+        """Return the number of appliances."""
+        return sum(len(appliances) for appliances in self._by_type.values())
+
+
+def appliance_store(hass: HomeAssistant, entry_id: str) -> Store[dict[str, Any]]:
+    """Return the store of a config entry's appliance snapshot."""
+    return Store(
+        hass,
+        APPLIANCE_STORE_VERSION,
+        f"{DOMAIN}.{entry_id}.appliances",
+        atomic_writes=True,
+    )
+
+
+def appliance_snapshot(data: dict[str, Any]) -> dict[str, Any]:
+    """Return pushed appliance data as stored, next to its content hash."""
+    content_hash = hashlib.sha256(
+        orjson.dumps(data, option=orjson.OPT_SORT_KEYS)
+    ).hexdigest()
+    return {"hash": content_hash, "appliances": data}
+
+
+@dataclass(slots=True)
+class ApplianceType:
+    """The entities of one appliance type, keyed by appliance name."""
+
+    build: ApplianceBuilder
+    async_add_entities: AddEntitiesCallback
+    update_before_add: bool
+    entities: dict[str, tuple[Appliance, Entity]] = field(default_factory=dict)
+
+
+class TISApplianceSync:
+    """Keep the entities of a config entry in line with the addon's appliances.
+
+    Pushed appliance data is kept in a Store next to the SHA-256 of its
+    compact, key sorted JSON, so a push with the same content is skipped
+    without parsing or diffing anything. Without a snapshot the appliance
+    file of the API is read instead, a missing or unreadable one meaning no
+    appliances yet. Either way it is read once per config entry into the
+    catalogue.
+    Platforms register a builder per appliance type instead of adding their
+    entities directly. When the addon pushes new appliance data it is
+    compared with the current appliances by name, the key their entities'
+    unique IDs derive from: only appliances that were added, removed or
+    changed get their entity added, removed or rebuilt. Every other entity
+    keeps running, so a push neither reloads the entry nor re-sends update
+    packets for untouched devices.
+    """
+
+    def __init__(self, hass: HomeAssistant, api: TISApi, entry_id: str) -> None:
+        """Initialize the sync."""
+        self.hass = hass
+        self.api = api
+        self._store = appliance_store(hass, entry_id)
+        self.content_hash: str | None = None
+        self.catalogue = ApplianceCatalogue({})
+        self._types: dict[str, ApplianceType] = {}
+        self.last_apply: dict[str, Any] = {}
+
+    async def async_load(self) -> None:
+        """Read the stored appliances into the catalogue."""
+        if (snapshot := await self._store.async_load()) is not None:
+            await self.api.parse_device_manager_request(snapshot["appliances"])
+            self.content_hash = snapshot["hash"]
+        else:
+            try:
+                await self.api.get_entities()
+            except Exception as err:  # noqa: BLE001
+                # no appliance pushed yet, the addon's first push fills it
+                _LOGGER.warning("Could not read the TIS appliance file: %s", err)
+                self.api.config_entries = {}
+        self.catalogue = ApplianceCatalogue(self.api.config_entries)
+
+    @callback
+    def async_setup_type(
+        self,
+        appliance_type: str,
+        build: ApplianceBuilder,
+        async_add_entities: AddEntitiesCallback,
+        update_before_add: bool = False,
+    ) -> None:
+        """Add the entities of an appliance type and track them."""
+        tracked = self._types[appliance_type] = ApplianceType(
+            build, async_add_entities, update_before_add
+        )
+        entities = []
+        for name, appliance in self.catalogue.of_type(appliance_type).items():
+            entity = build(self.api, appliance)
+            tracked.entities[name] = (appliance, entity)
+            entities.append(entity)
+        if entities:
+            async_add_entities(entities, update_before_add=update_before_add)
+
+    async def async_apply(self, data: dict[str, Any]) -> None:
+        """Apply pushed appliance data, touching only what changed."""
+        start = time.monotonic()
+        snapshot = appliance_snapshot(data)
+        content_hash = snapshot["hash"]
+        if content_hash == self.content_hash:
+            _LOGGER.debug("TIS appliances unchanged, skipping the push")
+            self.last_apply = {"skipped": True}
+            return
+        await self.api.parse_device_manager_request(data)
+        self.catalogue = ApplianceCatalogue(self.api.config_entries)
+        registry = er.async_get(self.hass)
+        added = removed = changed = 0
+        for appliance_type, tracked in self._types.items():
+            appliances = self.catalogue.of_type(appliance_type)
+            new_entities = []
+            for name in tracked.entities.keys() - appliances.keys():
+                _, entity = tracked.entities.pop(name)
+                if entity.registry_entry is not None:
+                    # the platform removes the entity along with its entry
+                    registry.async_remove(entity.entity_id)
+                else:
+                    await entity.async_remove()
+                removed += 1
+            for name, appliance in appliances.items():
+                if (current := tracked.entities.get(name)) is not None:
+                    if current[0] == appliance:
+                        continue
+                    await current[1].async_remove()
+                    changed += 1
+                else:
+                    added += 1
+                entity = tracked.build(self.api, appliance)
+                tracked.entities[name] = (appliance, entity)
+                new_entities.append(entity)
+            if new_entities:
+                tracked.async_add_entities(
+                    new_entities, update_before_add=tracked.update_before_add
+                )
+        self.content_hash = content_hash
+        await self._store.async_save(snapshot)
+        self.last_apply = {
+            "added": added,
+            "removed": removed,
+            "changed": changed,
+            "duration": time.monotonic() - start,
+        }
+        _LOGGER.info(
+            "TIS appliances applied: %s added, %s removed, %s changed",
+            added,
+            removed,
+            changed,
+        )
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        """Return the tracked appliances and the last apply."""
+        return {
+            "catalogue": len(self.catalogue),
+            "content_hash": self.content_hash,
+            "appliances": {
+                appliance_type: len(tracked.entities)
+                for appliance_type, tracked in self._types.items()
+            },
+            "last_apply": self.last_apply,
+        }
@@ -27,7 +27,11 @@ from homeassistant.core import Event, HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
 from . import TISConfigEntry
+from .appliances import Appliance
 from .const import FAN_MODES, TEMPERATURE_RANGES
+from .dispatcher import pack_device_id
+from .entities import TISEntityMixin
+from .gateways import SendPriority
 
 handler = TISProtocolHandler()
 
@@ -36,66 +40,36 @@ async def async_setup_entry(
     hass: HomeAssistant, entry: TISConfigEntry, async_add_devices: AddEntitiesCallback
 ) -> None:
     """Set up the climate platform."""
-    tis_api: TISApi = entry.runtime_data.api
-    # Fetch all ACs from the TIS API
-    acs: list[dict] = await tis_api.get_entities(platform="ac")
-    if acs:
-        # Prepare a list of tuples containing necessary ac details
-        ac_entities = [
-            (
-                appliance_name,
-                next(iter(appliance["channels"][0].values())),
-                appliance["device_id"],
-                appliance["is_protected"],
-                appliance["gateway"],
-            )
-            for ac in acs
-            for appliance_name, appliance in ac.items()
-        ]
-        # Create TISClimate objects and add them to Home Assistant
-        tis_acs = [
-            TISClimate(
-                tis_api=tis_api,
-                ac_name=ac_name,
-                ac_number=ac_number,
-                device_id=device_id,
-                gateway=gateway,
-            )
-            for ac_name, ac_number, device_id, is_protected, gateway in ac_entities
-        ]
-        # add your acs here
-        async_add_devices(tis_acs)
-
-    # Fetch all floor heating from the TIS API
-    heaters: list[dict] = await tis_api.get_entities(platform="floor_heating")
-    if heaters:
-        # Prepare a list of tuples containing necessary heater details
-        heater_entities = [
-            (
-                appliance_name,
-                next(iter(appliance["channels"][0].values())),
-                appliance["device_id"],
-                appliance["is_protected"],
-                appliance["gateway"],
-            )
-            for heater in heaters
-            for appliance_name, appliance in heater.items()
-        ]
-        # Create TISFloorHeating objects and add them to Home Assistant
-        tis_heaters = [
-            TISFloorHeating(
-                tis_api=tis_api,
-                heater_name=heater_name,
-                heater_number=heater_number,
-                device_id=device_id,
-                gateway=gateway,
-            )
-            for heater_name, heater_number, device_id, is_protected, gateway in heater_entities
-        ]
-        async_add_devices(tis_heaters)
-
-
-class TISClimate(ClimateEntity):
+    appliances = entry.runtime_data.appliances
+    appliances.async_setup_type("ac", build_ac, async_add_devices)
+    appliances.async_setup_type(
+        "floor_heating", build_floor_heater, async_add_devices
+    )
+
+
+def build_ac(tis_api: TISApi, ac: Appliance) -> TISClimate:
+    """Create the entity of an AC appliance."""
+    return TISClimate(
+        tis_api=tis_api,
+        ac_name=ac.name,
+        ac_number=ac.channels[0],
+        device_id=ac.device_id,
+        gateway=ac.gateway,
+    )
+
+
+def build_floor_heater(tis_api: TISApi, heater: Appliance) -> TISFloorHeating:
+    """Create the entity of a floor heating appliance."""
+    return TISFloorHeating(
+        tis_api=tis_api,
+        heater_name=heater.name,
+        heater_number=heater.channels[0],
+        device_id=heater.device_id,
+        gateway=heater.gateway,
+    )
+
+
+class TISClimate(TISEntityMixin, ClimateEntity):
     """Representation of a climate entity."""
 
     def __init__(
@@ -110,6 +84,7 @@ class TISClimate(ClimateEntity):
         self.api = tis_api
         self._name = ac_name
         self.device_id = device_id
+        self.device_address = pack_device_id(device_id)
         self.ac_number = int(ac_number) - 1
         self._attr_unique_id = f"ac_{self.device_id}_{self.ac_number}"
         self.gateway = gateway
@@ -119,7 +94,6 @@ class TISClimate(ClimateEntity):
         )
         # initialize all required attributes for the climate entity
         self.update_packet: TISPacket = handler.generate_ac_update_packet(self)
-        self.listener = None
         self._attr_state = STATE_OFF
         self._attr_target_temperature = None
         self._attr_current_temperature = None
@@ -173,122 +147,133 @@ class TISClimate(ClimateEntity):
         """Subscribe to events."""
 
         @callback
-        async def handle_event(event: Event):
+        def handle_event(event: Event) -> None:
             """Handle the event."""
-            if event.event_type == str(self.device_id):
-                feedback_type = event.data.get("feedback_type", None)
-                if feedback_type == "ac_feedback":
-                    ac_number = event.data["number"]
-                    sub_operation = event.data["sub_operation"]
-                    operation_value = event.data["operation_value"]
-
-                    if self.ac_number == int(ac_number):
-                        logging.warning("AC feedback event: %s", event.data)
-                        if sub_operation == 0x03:
-                            if operation_value == 0x00:
-                                # Turn off
-                                self._attr_state = STATE_OFF
-                                self._attr_hvac_mode = HVACMode.OFF
-                                logging.info("AC turned off")
-                        else:
-                            self._attr_state = STATE_ON
-                            if sub_operation == 0x04:
-                                # Update cool mode temperature
-                                self._attr_hvac_mode = HVACMode.COOL
-                                self._attr_target_temperature = operation_value
-                                self._attr_current_temperature = operation_value
-                                logging.info(
-                                    "Cool mode temperature updated to %s",
-                                    operation_value,
-                                )
-                            elif sub_operation == 0x05:
-                                # Update fan speed
-                                self._attr_fan_mode = next(
-                                    key
-                                    for key, value in FAN_MODES.items()
-                                    if value == operation_value
-                                )
-                                logging.info("Fan speed updated to %s", operation_value)
-                            elif sub_operation == 0x06:
-                                # Change HVAC mode
-                                self._attr_hvac_mode = next(
-                                    (
-                                        hvac_mode
-                                        for hvac_mode, settings in TEMPERATURE_RANGES.items()
-                                        if settings["packet_mode_index"]
-                                        == operation_value
-                                    ),
-                                    None,
-                                )
-                                logging.info("HVAC mode changed to %s", operation_value)
-                            elif sub_operation == 0x07:
-                                # Update heating mode temperature
-                                self._attr_hvac_mode = HVACMode.HEAT
-                                self._attr_target_temperature = operation_value
-                                self._attr_current_temperature = operation_value
-                                logging.info(
-                                    "Heating mode temperature updated to %s",
-                                    operation_value,
-                                )
-
-                            elif sub_operation == 0x08:
-                                # Update Auto mode temperature
-                                self._attr_hvac_mode = HVACMode.AUTO
-                                self._attr_target_temperature = operation_value
-                                self._attr_current_temperature = operation_value
-                                logging.info(
-                                    "Auto mode temperature updated to %s",
-                                    operation_value,
-                                )
-
-                            else:
-                                logging.error(
-                                    "Unknown sub operation for AC feedback: %s",
-                                    sub_operation,
-                                )
-                elif feedback_type == "update_feedback":
-                    if event.data["ac_number"] == self.ac_number:
-                        if event.data["state"] == 0x00:
-                            # turn off
+            feedback_type = event.data.get("feedback_type", None)
+            if feedback_type == "ac_feedback":
+                ac_number = event.data["number"]
+                sub_operation = event.data["sub_operation"]
+                operation_value = event.data["operation_value"]
+
+                if self.ac_number == int(ac_number):
+                    logging.warning("AC feedback event: %s", event.data)
+                    if sub_operation == 0x03:
+                        if operation_value == 0x00:
+                            # Turn off
                             self._attr_state = STATE_OFF
                             self._attr_hvac_mode = HVACMode.OFF
-                        else:
-                            self._attr_state = STATE_ON
+                            logging.info("AC turned off")
+                    else:
+                        self._attr_state = STATE_ON
+                        if sub_operation == 0x04:
+                            # Update cool mode temperature
+                            self._attr_hvac_mode = HVACMode.COOL
+                            self._attr_target_temperature = operation_value
+                            self._attr_current_temperature = operation_value
+                            logging.info(
+                                "Cool mode temperature updated to %s",
+                                operation_value,
+                            )
+                        elif sub_operation == 0x05:
+                            # Update fan speed
+                            self._attr_fan_mode = next(
+                                key
+                                for key, value in FAN_MODES.items()
+                                if value == operation_value
+                            )
+                            logging.info("Fan speed updated to %s", operation_value)
+                        elif sub_operation == 0x06:
+                            # Change HVAC mode
                             self._attr_hvac_mode = next(
                                 (
                                     hvac_mode
                                     for hvac_mode, settings in TEMPERATURE_RANGES.items()
                                     if settings["packet_mode_index"]
-                                    == event.data["hvac_mode"]
+                                    == operation_value
                                 ),
                                 None,
                             )
-                            self._attr_fan_mode = next(
-                                key
-                                for key, value in FAN_MODES.items()
-                                if value == event.data["fan_speed"]
+                            logging.info("HVAC mode changed to %s", operation_value)
+                        elif sub_operation == 0x07:
+                            # Update heating mode temperature
+                            self._attr_hvac_mode = HVACMode.HEAT
+                            self._attr_target_temperature = operation_value
+                            self._attr_current_temperature = operation_value
+                            logging.info(
+                                "Heating mode temperature updated to %s",
+                                operation_value,
+                            )
+
+                        elif sub_operation == 0x08:
+                            # Update Auto mode temperature
+                            self._attr_hvac_mode = HVACMode.AUTO
+                            self._attr_target_temperature = operation_value
+                            self._attr_current_temperature = operation_value
+                            logging.info(
+                                "Auto mode temperature updated to %s",
+                                operation_value,
+                            )
+
+                        else:
+                            logging.error(
+                                "Unknown sub operation for AC feedback: %s",
+                                sub_operation,
                             )
-                            # set temperature rangs
-                            self._attr_min_temp = TEMPERATURE_RANGES[self.hvac_mode][
-                                "min"
-                            ][self._unit_index]
-                            self._attr_max_temp = TEMPERATURE_RANGES[self.hvac_mode][
-                                "max"
-                            ][self._unit_index]
-                            # setting temperature based on mode
-                            if self._attr_hvac_mode == HVACMode.COOL:
-                                self._attr_target_temperature = event.data["cool_temp"]
-                            elif self._attr_hvac_mode == HVACMode.HEAT:
-                                self._attr_target_temperature = event.data["heat_temp"]
-                            elif self._attr_hvac_mode == HVACMode.AUTO:
-                                self._attr_target_temperature = event.data["auto_temp"]
-                            else:
-                                self._attr_target_temperature = None
-            self.async_write_ha_state()
-            await self.async_update_ha_state(True)
-
-        self.listener = self.hass.bus.async_listen(str(self.device_id), handle_event)
-        await self.api.protocol.sender.send_packet(self.update_packet)
+                    self.reconcile_feedback()
+            elif feedback_type == "update_feedback":
+                if event.data["ac_number"] == self.ac_number:
+                    if event.data["state"] == 0x00:
+                        # turn off
+                        self._attr_state = STATE_OFF
+                        self._attr_hvac_mode = HVACMode.OFF
+                    else:
+                        self._attr_state = STATE_ON
+                        self._attr_hvac_mode = next(
+                            (
+                                hvac_mode
+                                for hvac_mode, settings in TEMPERATURE_RANGES.items()
+                                if settings["packet_mode_index"]
+                                == event.data["hvac_mode"]
+                            ),
+                            None,
+                        )
+                        self._attr_fan_mode = next(
+                            key
+                            for key, value in FAN_MODES.items()
+                            if value == event.data["fan_speed"]
+                        )
+                        # set temperature rangs
+                        self._attr_min_temp = TEMPERATURE_RANGES[self.hvac_mode][
+                            "min"
+                        ][self._unit_index]
+                        self._attr_max_temp = TEMPERATURE_RANGES[self.hvac_mode][
+                            "max"
+                        ][self._unit_index]
+                        # setting temperature based on mode
+                        if self._attr_hvac_mode == HVACMode.COOL:
+                            self._attr_target_temperature = event.data["cool_temp"]
+                        elif self._attr_hvac_mode == HVACMode.HEAT:
+                            self._attr_target_temperature = event.data["heat_temp"]
+                        elif self._attr_hvac_mode == HVACMode.AUTO:
+                            self._attr_target_temperature = event.data["auto_temp"]
+                        else:
+                            self._attr_target_temperature = None
+                    self.reconcile_feedback()
+            self.async_write_state_if_changed()
+
+        dispatcher = self.runtime_data.dispatcher
+        self.async_on_remove(
+            dispatcher.async_subscribe(
+                self.device_address,
+                ("ac_feedback",
+                "update_feedback"),
+                handle_event,
+            )
+        )
+        self.async_set_probe(self.update_packet)
+        self.runtime_data.gateway_sender.async_send(
+            self.update_packet, SendPriority.STATE_SYNC
+        )
 
     # getters
     @property
@@ -368,10 +353,7 @@ class TISClimate(ClimateEntity):
             target_mode=hvac_mode,
         )
 
-        # Send the packet and check for acknowledgment
-        ack_stats = await self.api.protocol.sender.send_packet_with_ack(packet)
-        if ack_stats:
-            # Update the class attributes only if the packet is acknowledged
+        def apply_hvac_mode() -> None:
             self._attr_hvac_mode = hvac_mode
             self._attr_state = new_state
             self._attr_min_temp = new_min_temp
@@ -379,6 +361,16 @@ class TISClimate(ClimateEntity):
             self._attr_current_temperature = self._attr_target_temperature = (
                 new_target_temperature
             )
+
+        if self.optimistic:
+            apply_hvac_mode()
+            self.async_write_optimistic_state()
+        # Send the packet and check for acknowledgment
+        ack_stats = await self.runtime_data.ack_tracker.send_packet_with_ack(packet)
+        self.reconcile_ack(ack_stats)
+        if ack_stats:
+            # Update the class attributes only if the packet is acknowledged
+            apply_hvac_mode()
         else:
             logging.error("Failed to set hvac mode")
             self._attr_state = STATE_UNKNOWN
@@ -393,7 +385,11 @@ class TISClimate(ClimateEntity):
             FAN_MODES,
             target_fan_mode=fan_mode,
         )
-        ack_stats = await self.api.protocol.sender.send_packet_with_ack(packet)
+        if self.optimistic:
+            self._attr_fan_mode = fan_mode
+            self.async_write_optimistic_state()
+        ack_stats = await self.runtime_data.ack_tracker.send_packet_with_ack(packet)
+        self.reconcile_ack(ack_stats)
         if ack_stats:
             self._attr_fan_mode = fan_mode
         else:
@@ -412,7 +408,13 @@ class TISClimate(ClimateEntity):
             FAN_MODES,
             target_temperature=new_target_temperature,
         )
-        ack_status = await self.api.protocol.sender.send_packet_with_ack(packet)
+        if self.optimistic:
+            self._attr_current_temperature = self._attr_target_temperature = (
+                new_target_temperature
+            )
+            self.async_write_optimistic_state()
+        ack_status = await self.runtime_data.ack_tracker.send_packet_with_ack(packet)
+        self.reconcile_ack(ack_status)
         if ack_status:
             self._attr_current_temperature = self._attr_target_temperature = (
                 new_target_temperature
@@ -431,8 +433,29 @@ class TISClimate(ClimateEntity):
             self._attr_current_temperature = None
         self.async_write_ha_state()
 
+    def state_snapshot(self) -> tuple:
+        """Return the attributes feedback can change."""
+        return (
+            self._attr_state,
+            self._attr_hvac_mode,
+            self._attr_fan_mode,
+            self._attr_target_temperature,
+            self._attr_current_temperature,
+            self._attr_min_temp,
+            self._attr_max_temp,
+        )
+
+    def optimistic_snapshot(self) -> tuple:
+        """Return the attributes an optimistic write is reconciled on."""
+        return (
+            self._attr_state,
+            self._attr_hvac_mode,
+            self._attr_fan_mode,
+            self._attr_target_temperature,
+        )
+
 
-class TISFloorHeating(ClimateEntity):
+class TISFloorHeating(TISEntityMixin, ClimateEntity):
     """Representation of a climate entity."""
 
     def __init__(
@@ -447,6 +470,7 @@ class TISFloorHeating(ClimateEntity):
         self.api = tis_api
         self._name = heater_name
         self.device_id = device_id
+        self.device_address = pack_device_id(device_id)
         self.heater_number = int(heater_number) - 1
         self._attr_unique_id = f"floor_heater_{self.device_id}_{self.heater_number}"
         self.gateway = gateway
@@ -456,7 +480,6 @@ class TISFloorHeating(ClimateEntity):
         )
         # initialize all required attributes for the climate entity
         self.update_packet: TISPacket = handler.generate_floor_update_packet(self)
-        self.listener = None
         self._attr_state = STATE_OFF
         self._attr_target_temperature = None
         self._attr_current_temperature = None
@@ -496,68 +519,77 @@ class TISFloorHeating(ClimateEntity):
         """Subscribe to events."""
 
         @callback
-        async def handle_event(event: Event):
+        def handle_event(event: Event) -> None:
             """Handle the event."""
-            if event.event_type == str(self.device_id):
-                feedback_type = event.data.get("feedback_type", None)
-                if feedback_type == "floor_feedback":
-                    logging.warning("floor heating feedback event: %s", event.data)
-                    heater_number = event.data["number"]
-                    sub_operation = event.data["sub_operation"]
-                    operation_value = event.data["operation_value"]
-
-                    if self.heater_number == int(heater_number):
-                        if sub_operation == 0x14:
-                            if operation_value == 0x00:
-                                # Turn off
-                                self._attr_state = STATE_OFF
-                                self._attr_hvac_mode = HVACMode.OFF
-                                logging.info("Heater turned off")
-                            else:
-                                self._attr_state = STATE_ON
-                                self._attr_hvac_mode = HVACMode.HEAT
-                                self._attr_target_temperature = operation_value
-                                self._attr_current_temperature = operation_value
-                                logging.info(
-                                    "Heating mode temperature updated to %s",
-                                    operation_value,
-                                )
-                        elif sub_operation == 0x18:
-                            # set temperature
-                            self._attr_target_temperature = operation_value
-                            self._attr_current_temperature = operation_value
-                        else:
-                            logging.error(
-                                "Unknown sub operation for AC feedback: %s",
-                                sub_operation,
-                            )
-                elif feedback_type == "floor_update":
-                    logging.warning("floor heating update event: %s", event.data)
-                    if event.data["heater_number"] == self.heater_number:
-                        if event.data["state"] == 0x00:
-                            # turn off
+            feedback_type = event.data.get("feedback_type", None)
+            if feedback_type == "floor_feedback":
+                logging.warning("floor heating feedback event: %s", event.data)
+                heater_number = event.data["number"]
+                sub_operation = event.data["sub_operation"]
+                operation_value = event.data["operation_value"]
+
+                if self.heater_number == int(heater_number):
+                    if sub_operation == 0x14:
+                        if operation_value == 0x00:
+                            # Turn off
                             self._attr_state = STATE_OFF
                             self._attr_hvac_mode = HVACMode.OFF
+                            logging.info("Heater turned off")
                         else:
                             self._attr_state = STATE_ON
                             self._attr_hvac_mode = HVACMode.HEAT
-                            # set temperature rangs
-                            self._attr_min_temp = TEMPERATURE_RANGES[self.hvac_mode][
-                                "min"
-                            ][self._unit_index]
-                            self._attr_max_temp = TEMPERATURE_RANGES[self.hvac_mode][
-                                "max"
-                            ][self._unit_index]
-                            # setting temperature based on mode
-                            if self._attr_hvac_mode == HVACMode.HEAT:
-                                self._attr_target_temperature = event.data["temp"]
-                            else:
-                                self._attr_target_temperature = None
-            self.async_write_ha_state()
-            await self.async_update_ha_state(True)
-
-        self.listener = self.hass.bus.async_listen(str(self.device_id), handle_event)
-        await self.api.protocol.sender.send_packet(self.update_packet)
+                            self._attr_target_temperature = operation_value
+                            self._attr_current_temperature = operation_value
+                            logging.info(
+                                "Heating mode temperature updated to %s",
+                                operation_value,
+                            )
+                    elif sub_operation == 0x18:
+                        # set temperature
+                        self._attr_target_temperature = operation_value
+                        self._attr_current_temperature = operation_value
+                    else:
+                        logging.error(
+                            "Unknown sub operation for AC feedback: %s",
+                            sub_operation,
+                        )
+            elif feedback_type == "floor_update":
+                logging.warning("floor heating update event: %s", event.data)
+                if event.data["heater_number"] == self.heater_number:
+                    if event.data["state"] == 0x00:
+                        # turn off
+                        self._attr_state = STATE_OFF
+                        self._attr_hvac_mode = HVACMode.OFF
+                    else:
+                        self._attr_state = STATE_ON
+                        self._attr_hvac_mode = HVACMode.HEAT
+                        # set temperature rangs
+                        self._attr_min_temp = TEMPERATURE_RANGES[self.hvac_mode][
+                            "min"
+                        ][self._unit_index]
+                        self._attr_max_temp = TEMPERATURE_RANGES[self.hvac_mode][
+                            "max"
+                        ][self._unit_index]
+                        # setting temperature based on mode
+                        if self._attr_hvac_mode == HVACMode.HEAT:
+                            self._attr_target_temperature = event.data["temp"]
+                        else:
+                            self._attr_target_temperature = None
+            self.async_write_state_if_changed()
+
+        dispatcher = self.runtime_data.dispatcher
+        self.async_on_remove(
+            dispatcher.async_subscribe(
+                self.device_address,
+                ("floor_feedback",
+                "floor_update"),
+                handle_event,
+            )
+        )
+        self.async_set_probe(self.update_packet)
+        self.runtime_data.gateway_sender.async_send(
+            self.update_packet, SendPriority.STATE_SYNC
+        )
 
     # getters
     @property
@@ -605,12 +637,23 @@ class TISFloorHeating(ClimateEntity):
         """Return False if entity pushes its state to HA."""
         return False
 
+    def state_snapshot(self) -> tuple:
+        """Return the attributes feedback can change."""
+        return (
+            self._attr_state,
+            self._attr_hvac_mode,
+            self._attr_target_temperature,
+            self._attr_current_temperature,
+            self._attr_min_temp,
+            self._attr_max_temp,
+        )
+
     async def async_set_hvac_mode(self, hvac_mode: HVACMode) -> None:
         """Set the HVAC mode and store changes only after the packet is sent."""
         packet = handler.generate_floor_on_off_packet(
             self, 0x00 if hvac_mode == HVACMode.OFF else 0x01
         )
-        await self.api.protocol.sender.send_packet(packet)
+        self.runtime_data.gateway_sender.async_send(packet, SendPriority.CONTROL)
 
     async def async_set_temperature(self, **kwargs: Any) -> None:
         """Set new target temperature."""
@@ -618,8 +661,8 @@ class TISFloorHeating(ClimateEntity):
         packet = handler.generate_floor_on_off_packet(
             self, 0x00 if self._attr_state == STATE_OFF else 0x01
         )
-        await self.api.protocol.sender.send_packet(packet)
+        self.runtime_data.gateway_sender.async_send(packet, SendPriority.CONTROL)
         packet = handler.generate_floor_set_temp_packet(
             self, int(new_target_temperature)
         )
-        await self.api.protocol.sender.send_packet_with_ack(packet)
+        await self.runtime_data.ack_tracker.send_packet_with_ack(packet)
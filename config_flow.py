@@ -36,11 +36,23 @@ import logging
 
 import voluptuous as vol
 
-from homeassistant.config_entries import ConfigFlow, ConfigFlowResult
+from homeassistant.config_entries import (
+    ConfigEntry,
+    ConfigFlow,
+    ConfigFlowResult,
+    OptionsFlow,
+    OptionsFlowWithConfigEntry,
+)
 from homeassistant.const import CONF_PORT
 from homeassistant.core import callback
 
-from .const import DOMAIN
+from .const import (
+    CONF_ADAPTIVE_POLLING,
+    CONF_OPTIMISTIC,
+    CONF_WRITE_COOLDOWN,
+    DOMAIN,
+    STATE_WRITE_COOLDOWN,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -52,6 +64,12 @@ class TISConfigFlow(ConfigFlow, domain=DOMAIN):
 
     VERSION = 1
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry: ConfigEntry) -> OptionsFlow:
+        """Return the options flow."""
+        return TISOptionsFlow(config_entry)
+
     async def async_step_user(self, user_input: dict | None = None) -> ConfigFlowResult:
         """Handle a flow initiated by the user."""
         errors = {}
@@ -90,3 +108,34 @@ class TISConfigFlow(ConfigFlow, domain=DOMAIN):
             if 1 <= port <= 65535:
                 return True
         return False
+
+
+class TISOptionsFlow(OptionsFlowWithConfigEntry):
+    """Handle the TISControl options."""
+
+    async def async_step_init(self, user_input: dict | None = None) -> ConfigFlowResult:
+        """Manage the options."""
+        if user_input is not None:
+            return self.async_create_entry(title="", data={**self.options, **user_input})
+
+        return self.async_show_form(
+            step_id="init",
+            data_schema=vol.Schema(
+                {
+                    vol.Optional(
+                        CONF_OPTIMISTIC,
+                        default=self.options.get(CONF_OPTIMISTIC, False),
+                    ): bool,
+                    vol.Optional(
+                        CONF_ADAPTIVE_POLLING,
+                        default=self.options.get(CONF_ADAPTIVE_POLLING, False),
+                    ): bool,
+                    vol.Optional(
+                        CONF_WRITE_COOLDOWN,
+                        default=self.options.get(
+                            CONF_WRITE_COOLDOWN, STATE_WRITE_COOLDOWN
+                        ),
+                    ): vol.All(vol.Coerce(float), vol.Range(min=0, max=5)),
+                }
+            ),
+        )
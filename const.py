@@ -72,3 +72,68 @@ FAN_MODES = {
     FAN_MEDIUM: 2,
     FAN_LOW: 3,
 }
+
+SERVICE_BULK_CONTROL = "bulk_control"
+# seconds between consecutive packets of a bulk command on one gateway
+BULK_PACKET_INTERVAL = 0.005
+
+# ACK tracking per gateway
+ACK_WINDOW = 4  # packets awaiting an ACK at once
+ACK_TIMEOUT = 1.0  # seconds per attempt
+ACK_RETRIES = 4
+ACK_BACKOFF = 0.2  # seconds, doubled on every retry
+
+# write target state before the ACK and reconcile afterwards
+CONF_OPTIMISTIC = "optimistic"
+
+# outbound scheduling per gateway: seconds the gateway must have been quiet
+# before a state sync, poll or discovery packet is sent; control packets and
+# ACK retries never wait
+GATEWAY_SEND_INTERVAL = 0.05
+GATEWAY_POLL_INTERVAL = 0.1
+GATEWAY_DISCOVERY_INTERVAL = 0.5
+
+# startup state sync: seconds to wait for a device's update_response, and
+# re-sends for silent devices
+UPDATE_RESPONSE_TIMEOUT = 2.0
+STATE_SYNC_RETRIES = 2
+
+# health sensor polling: default seconds between polls of one device, and
+# how early a poll may be sent to share a timer wake-up with another
+HEALTH_POLL_INTERVAL = 30.0
+HEALTH_POLL_SLACK = 0.5
+
+# adaptive health polling: readings within these thresholds count as steady,
+# steady devices are polled HEALTH_POLL_BACKOFF times less often and moving
+# ones as much more often, within the min/max seconds
+CONF_ADAPTIVE_POLLING = "adaptive_polling"
+HEALTH_TEMP_THRESHOLD = 0.5  # degrees
+HEALTH_LUX_THRESHOLD = 10
+HEALTH_POLL_BACKOFF = 2.0
+HEALTH_POLL_MIN_INTERVAL = 10.0
+HEALTH_POLL_MAX_INTERVAL = 300.0
+
+# minimum seconds between two state writes of an entity caused by feedback;
+# writes in between are dropped and the latest state is written at the end
+CONF_WRITE_COOLDOWN = "write_cooldown"
+STATE_WRITE_COOLDOWN = 0.25
+
+# device discovery: most broadcasts per scan, broadcasts before a scan may
+# end, and seconds without a new device before the next broadcast
+DISCOVERY_BROADCASTS = 10
+DISCOVERY_MIN_BROADCASTS = 2
+DISCOVERY_QUIET_TIME = 0.5
+
+# discovered device inventory: seconds between background refreshes and
+# before a changed inventory is written
+DISCOVERY_REFRESH_INTERVAL = 60.0
+DEVICE_INVENTORY_SAVE_DELAY = 10.0
+DEVICE_INVENTORY_STORE_VERSION = 1
+
+# version of the stored appliance snapshot
+APPLIANCE_STORE_VERSION = 1
+
+# device liveness: unanswered commands in a row before a device is offline,
+# and seconds between status probes of an offline device
+LIVENESS_OFFLINE_FAILURES = 3
+LIVENESS_PROBE_INTERVAL = 30.0
@@ -0,0 +1,112 @@
+"""Helpers for sending TIS control packets."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable, Iterable, Sequence
+from typing import Any
+
+from TISControlProtocol.Protocols.udp.ProtocolHandler import TISPacket
+
+from .ack_tracker import TISAckTracker
+from .const import BULK_PACKET_INTERVAL
+
+
+async def send_packets_with_ack(
+    ack_tracker: TISAckTracker, packets: Sequence[TISPacket], interval: float = 0
+) -> list[bool]:
+    """Send a batch of packets and wait for their ACKs concurrently.
+
+    All packets are handed to the ACK tracker at once and their ACKs are
+    awaited together, so the batch takes one round trip plus the slowest ACK
+    instead of the sum of them.
+    With an interval, packet n is sent n * interval seconds after the first
+    to pace the bus. Returns the ACK status of each packet, in order.
+    """
+
+    async def send(index: int, packet: TISPacket) -> bool:
+        if interval:
+            await asyncio.sleep(index * interval)
+        return await ack_tracker.send_packet_with_ack(packet)
+
+    results = await asyncio.gather(
+        *(send(index, packet) for index, packet in enumerate(packets)),
+        return_exceptions=True,
+    )
+    return [
+        not isinstance(result, BaseException) and bool(result) for result in results
+    ]
+
+
+async def async_bulk_control(entities: Iterable[Any], turn_on: bool) -> None:
+    """Switch many TIS entities on or off in one paced pipeline.
+
+    Entities must provide generate_state_packet and apply_state_ack. They are
+    grouped by gateway and device, each gateway gets its own paced pipeline,
+    and all states are written together once every ACK is in.
+    """
+    gateways: dict[str, dict[int, list[Any]]] = {}
+    for entity in entities:
+        gateways.setdefault(entity.gateway, {}).setdefault(
+            entity.device_address, []
+        ).append(entity)
+
+    async def control_gateway(devices: dict[int, list[Any]]) -> list[tuple]:
+        ordered = [entity for channels in devices.values() for entity in channels]
+        ack_statuses = await send_packets_with_ack(
+            ordered[0].runtime_data.ack_tracker,
+            [entity.generate_state_packet(turn_on) for entity in ordered],
+            interval=BULK_PACKET_INTERVAL,
+        )
+        return list(zip(ordered, ack_statuses, strict=True))
+
+    results = await asyncio.gather(
+        *(control_gateway(devices) for devices in gateways.values())
+    )
+    updated = []
+    for gateway_results in results:
+        for entity, ack_status in gateway_results:
+            entity.apply_state_ack(turn_on, ack_status)
+            updated.append(entity)
+    for entity in updated:
+        entity.async_write_ha_state()
+
+
+class CommandCoalescer:
+    """Coalesce rapid commands on one channel down to the latest target.
+
+    While a command is in flight only the most recent requested value is
+    kept; once the in-flight command resolves that value is sent, and any
+    values it replaced are dropped. Every caller that joined the burst gets
+    back the (value, ack_status) of the last command sent, so all of them
+    settle on the same final state.
+    """
+
+    __slots__ = ("_send", "_latest", "_has_latest", "_result")
+
+    def __init__(self, send: Callable[[Any], Awaitable[bool]]) -> None:
+        """Initialize the coalescer around a send(value) -> ack coroutine."""
+        self._send = send
+        self._latest: Any = None
+        self._has_latest = False
+        self._result: asyncio.Future[tuple[Any, bool]] | None = None
+
+    async def async_send(self, value: Any) -> tuple[Any, bool]:
+        """Request value to be sent, return the final (value, ack_status)."""
+        if self._result is not None:
+            self._latest = value
+            self._has_latest = True
+            return await asyncio.shield(self._result)
+
+        self._result = result = asyncio.get_running_loop().create_future()
+        ack_status = False
+        try:
+            ack_status = await self._send(value)
+            while self._has_latest:
+                value, self._latest, self._has_latest = self._latest, None, False
+                ack_status = await self._send(value)
+        finally:
+            self._result = None
+            self._latest, self._has_latest = None, False
+            result.set_result((value, ack_status))
+        return value, ack_status
@@ -1,7 +1,12 @@
-"""Define a generic data update coordinator."""
+"""Shared poll scheduler for TIS health sensors."""
 
-from datetime import timedelta
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+import heapq
 import logging
+from typing import Any
 
 from TISControlProtocol.api import TISApi
 from TISControlProtocol.Protocols.udp.ProtocolHandler import (
@@ -9,37 +14,275 @@ from TISControlProtocol.Protocols.udp.ProtocolHandler import (
     TISProtocolHandler,
 )
 
-from homeassistant.core import HomeAssistant
-from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+
+from .const import (
+    HEALTH_LUX_THRESHOLD,
+    HEALTH_POLL_BACKOFF,
+    HEALTH_POLL_INTERVAL,
+    HEALTH_POLL_MAX_INTERVAL,
+    HEALTH_POLL_MIN_INTERVAL,
+    HEALTH_POLL_SLACK,
+    HEALTH_TEMP_THRESHOLD,
+    UPDATE_RESPONSE_TIMEOUT,
+)
+from .dispatcher import TISDispatcher, pack_device_id
+from .gateways import SendPriority, TISGatewaySender
+from .packets import PacketTarget
 
 _LOGGER = logging.getLogger(__name__)
 HANDLER = TISProtocolHandler()
 
+DeviceKey = tuple[str, int]
+
+
+def _spread(index: int) -> float:
+    """Return the phase in [0, 1) of the index-th polled device.
+
+    This is the base 2 van der Corput sequence (0, 1/2, 1/4, 3/4, ...), so
+    the first n devices are always close to evenly spaced over the interval
+    without moving devices that were already scheduled.
+    """
+    phase, denominator = 0.0, 1
+    while index:
+        denominator <<= 1
+        index, bit = divmod(index, 2)
+        phase += bit / denominator
+    return phase
+
+
+def _is_significant(
+    previous: tuple[float | None, float | None],
+    reading: tuple[float | None, float | None],
+) -> bool:
+    """Return True if a (temp, lux) reading moved past the thresholds."""
+    for old, new, threshold in zip(
+        previous, reading, (HEALTH_TEMP_THRESHOLD, HEALTH_LUX_THRESHOLD)
+    ):
+        if old is None or new is None:
+            if old is not new:
+                return True
+        elif abs(float(new) - float(old)) > threshold:
+            return True
+    return False
+
+
+@dataclass(slots=True)
+class HealthPoll:
+    """Poll state of one health sensor device."""
+
+    device_id: list[int]
+    packet: TISPacket
+    interval: float
+    due: float
+    unsubscribe: CALLBACK_TYPE
+    users: int = 1
+    reading: tuple[float | None, float | None] | None = None
+    polled_at: float = float("-inf")
+    feedback_at: float | None = None
+    pushed_at: float | None = None
+
+
+class TISHealthCoordinator:
+    """Poll every health sensor of a config entry from one timer.
+
+    Devices are kept in a heap ordered by their next due time and a single
+    timer is armed for the earliest of them. When it fires, every device due
+    within HEALTH_POLL_SLACK is polled in the same wake-up, so the number of
+    wake-ups depends on the interval, not on the number of sensors. Polls
+    are handed to the send queue of their gateway. Devices are polled every
+    HEALTH_POLL_INTERVAL, and new devices get a phase from _spread so polls
+    stay evenly distributed.
 
-class SensorUpdateCoordinator(DataUpdateCoordinator):
-    """Define a sensor data update coordinator."""
+    In adaptive mode the interval of a device doubles, up to
+    HEALTH_POLL_MAX_INTERVAL, every time a reading stays within the
+    significance thresholds of the previous one, and halves, down to
+    HEALTH_POLL_MIN_INTERVAL, every time it moves.
+
+    Polling is only a heartbeat: feedback arriving later than
+    UPDATE_RESPONSE_TIMEOUT after a poll was pushed by the device, and a
+    device that pushed within its interval is not polled at its next slot.
+    """
 
     def __init__(
         self,
         hass: HomeAssistant,
         api: TISApi,
-        update_interval: timedelta,
-        device_id: list[int, int],
-        update_packet: TISPacket,
+        dispatcher: TISDispatcher,
+        gateways: TISGatewaySender,
+        adaptive: bool = False,
     ) -> None:
         """Initialize the coordinator."""
+        self.hass = hass
         self.api = api
-        self.device_id = device_id
-        self.update_packet = update_packet
-        super().__init__(
-            hass,
-            _LOGGER,
-            name=f"Sensor Update Coordinator for {device_id}",
-            update_interval=timedelta(seconds=30),
+        self.dispatcher = dispatcher
+        self.gateways = gateways
+        self.adaptive = adaptive
+        self._polls: dict[DeviceKey, HealthPoll] = {}
+        self._heap: list[tuple[float, DeviceKey]] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._timer_due: float | None = None
+        self._added = 0
+        self.polls_sent = 0
+        self.polls_skipped = 0
+        self.pushes = 0
+        self.wakeups = 0
+
+    @callback
+    def async_add_device(self, gateway: str, device_id: list[int]) -> CALLBACK_TYPE:
+        """Start polling a device, return the function that stops it.
+
+        Sensors of the same device share one poll.
+        """
+        device_address = pack_device_id(device_id)
+        key = (gateway, device_address)
+        if (poll := self._polls.get(key)) is not None:
+            poll.users += 1
+        else:
+            due = self.hass.loop.time() + HEALTH_POLL_INTERVAL * _spread(self._added)
+            self._added += 1
+
+            @callback
+            def handle_health_feedback(event: Event) -> None:
+                self._async_handle_reading(key, event)
+
+            poll = self._polls[key] = HealthPoll(
+                device_id,
+                HANDLER.generate_health_sensor_update_packet(
+                    entity=PacketTarget(device_id, self.api, gateway)
+                ),
+                HEALTH_POLL_INTERVAL,
+                due,
+                self.dispatcher.async_subscribe(
+                    device_address, ("health_feedback",), handle_health_feedback
+                ),
+            )
+            heapq.heappush(self._heap, (due, key))
+            self._async_schedule()
+
+        @callback
+        def async_remove_device() -> None:
+            """Stop polling the device once its last sensor is gone."""
+            poll.users -= 1
+            if not poll.users and self._polls.get(key) is poll:
+                del self._polls[key]
+                poll.unsubscribe()
+
+        return async_remove_device
+
+    @callback
+    def _async_handle_reading(self, key: DeviceKey, event: Event) -> None:
+        """Adapt the interval of a device to how much its reading moved."""
+        poll = self._polls[key]
+        poll.feedback_at = now = self.hass.loop.time()
+        if now > poll.polled_at + UPDATE_RESPONSE_TIMEOUT:
+            poll.pushed_at = now
+            self.pushes += 1
+        reading = (event.data.get("temp"), event.data.get("lux"))
+        previous, poll.reading = poll.reading, reading
+        if not self.adaptive or previous is None:
+            return
+        if _is_significant(previous, reading):
+            interval = poll.interval / HEALTH_POLL_BACKOFF
+        else:
+            interval = poll.interval * HEALTH_POLL_BACKOFF
+        interval = min(
+            max(interval, HEALTH_POLL_MIN_INTERVAL), HEALTH_POLL_MAX_INTERVAL
         )
+        self._async_set_interval(key, interval)
+
+    @callback
+    def _async_set_interval(self, key: DeviceKey, interval: float) -> None:
+        """Change the interval of a device, moving its pending poll."""
+        poll = self._polls[key]
+        if interval == poll.interval:
+            return
+        # the pending poll was scheduled one old interval after the last one
+        poll.due = max(poll.due - poll.interval + interval, self.hass.loop.time())
+        poll.interval = interval
+        heapq.heappush(self._heap, (poll.due, key))
+        self._async_schedule()
+
+    @callback
+    def async_set_adaptive(self, adaptive: bool) -> None:
+        """Turn adaptive intervals on or off."""
+        self.adaptive = adaptive
+        if not adaptive:
+            for key in self._polls:
+                self._async_set_interval(key, HEALTH_POLL_INTERVAL)
+
+    @callback
+    def _async_schedule(self) -> None:
+        """Arm the timer for the earliest due poll."""
+        while self._heap and self._is_stale(*self._heap[0]):
+            heapq.heappop(self._heap)
+        if not self._heap:
+            return
+        due = self._heap[0][0]
+        if self._timer is not None:
+            if self._timer_due <= due:
+                return
+            self._timer.cancel()
+        self._timer_due = due
+        self._timer = self.hass.loop.call_at(due, self._async_poll_due)
+
+    def _is_stale(self, due: float, key: DeviceKey) -> bool:
+        """Return True if a heap entry no longer matches a polled device."""
+        poll = self._polls.get(key)
+        return poll is None or poll.due != due
+
+    @callback
+    def _async_poll_due(self) -> None:
+        """Poll every device that is due, then re-arm the timer."""
+        self._timer = self._timer_due = None
+        self.wakeups += 1
+        now = self.hass.loop.time()
+        while self._heap and self._heap[0][0] <= now + HEALTH_POLL_SLACK:
+            due, key = heapq.heappop(self._heap)
+            if self._is_stale(due, key):
+                continue
+            poll = self._polls[key]
+            if poll.pushed_at is not None and now - poll.pushed_at < poll.interval:
+                self.polls_skipped += 1
+            else:
+                poll.polled_at = now
+                self.gateways.async_send(poll.packet, SendPriority.POLL)
+                self.polls_sent += 1
+            # keep the phase, skipping the polls missed while the loop was busy
+            poll.due = due + poll.interval * max(1, -((due - now) // poll.interval))
+            heapq.heappush(self._heap, (poll.due, key))
+        self._async_schedule()
+
+    @callback
+    def async_stop(self) -> None:
+        """Cancel the poll timer."""
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = self._timer_due = None
+        for poll in self._polls.values():
+            poll.unsubscribe()
+        self._polls.clear()
+        self._heap.clear()
 
-    async def _async_update_data(self) -> bool:
-        """Fetch data from API."""
-        # Here you should return the data fetched from the API
-        logging.error(f"Update New async update date: {self.update_packet}")
-        return await self.api.protocol.sender.send_packet(self.update_packet)
+    @property
+    def stats(self) -> dict[str, Any]:
+        """Return the poll counters."""
+        now = self.hass.loop.time()
+        return {
+            "devices": len(self._polls),
+            "adaptive": self.adaptive,
+            "polls_sent": self.polls_sent,
+            "polls_skipped": self.polls_skipped,
+            "pushes": self.pushes,
+            "wakeups": self.wakeups,
+            "intervals": {
+                f"{gateway} {device_address:#06x}": poll.interval
+                for (gateway, device_address), poll in self._polls.items()
+            },
+            "feedback_age": {
+                f"{gateway} {device_address:#06x}": (
+                    None if poll.feedback_at is None else now - poll.feedback_at
+                )
+                for (gateway, device_address), poll in self._polls.items()
+            },
+        }
@@ -1,11 +1,9 @@
 """Cover platform fot TIS Control."""
 
 import logging
-from math import ceil
 from typing import Any
 
 from TISControlProtocol.api import TISApi
-from TISControlProtocol.BytesHelper import int_to_8_bit_binary
 from TISControlProtocol.Protocols.udp.ProtocolHandler import (
     TISPacket,
     TISProtocolHandler,
@@ -17,13 +15,19 @@ from homeassistant.components.cover import (
     CoverEntity,
     CoverEntityFeature,
 )
-from homeassistant.const import STATE_CLOSING, STATE_OPENING, STATE_UNKNOWN, Platform
+from homeassistant.const import STATE_CLOSING, STATE_OPENING, Platform
 from homeassistant.core import Event, HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
 from . import TISConfigEntry
+from .appliances import Appliance
+from .control import CommandCoalescer
+from .dispatcher import pack_device_id
+from .entities import TISEntityMixin
+from .packets import device_update_packet
 
 handler = TISProtocolHandler()
+COVER_FEEDBACK_TYPES = ("control_response", "binary_feedback", "update_response")
 
 
 async def async_setup_entry(
@@ -31,66 +35,40 @@ async def async_setup_entry(
     entry: TISConfigEntry,
     async_add_devices: AddEntitiesCallback,
 ) -> None:
-    """Set up TIS Control lights."""
-    tis_api: TISApi = entry.runtime_data.api
-    # Fetch all covers from the TIS API
-    covers_w_pos: dict = await tis_api.get_entities(platform="motor")
-    covers: dict = await tis_api.get_entities(platform="shutter")
-
-    if covers_w_pos:
-        # Prepare a list of tuples containing necessary cover details
-        cover_entities = [
-            (
-                cover_name,
-                next(iter(cover["channels"][0].values())),
-                cover["device_id"],
-                cover["gateway"],
-            )
-            for cover in covers_w_pos
-            for cover_name, cover in cover.items()
-        ]
-        # Create TISCover objects and add them to Home Assistant
-        tis_covers = [
-            TISCoverWPos(
-                tis_api=tis_api,
-                cover_name=cover_name,
-                channel_number=channel_number,
-                device_id=device_id,
-                gateway=gateway,
-            )
-            for cover_name, channel_number, device_id, gateway in cover_entities
-        ]
-        async_add_devices(tis_covers, update_before_add=True)
-
-    if covers:
-        # Prepare a list of tuples containing necessary cover details
-        cover_entities = [
-            (
-                cover_name,
-                next(iter(cover["channels"][0].values())),
-                next(iter(cover["channels"][1].values())),
-                cover["device_id"],
-                cover["gateway"],
-            )
-            for cover in covers
-            for cover_name, cover in cover.items()
-        ]
-        # Create TISCover objects and add them to Home Assistant
-        tis_covers = [
-            TISCoverNoPos(
-                tis_api=tis_api,
-                cover_name=cover_name,
-                up_channel_number=up_channel_number,
-                down_channel_number=down_channel_number,
-                device_id=device_id,
-                gateway=gateway,
-            )
-            for cover_name, up_channel_number, down_channel_number, device_id, gateway in cover_entities
-        ]
-        async_add_devices(tis_covers, update_before_add=True)
-
-
-class TISCoverWPos(CoverEntity):
+    """Set up TIS Control covers."""
+    appliances = entry.runtime_data.appliances
+    appliances.async_setup_type(
+        "motor", build_cover_w_pos, async_add_devices, update_before_add=True
+    )
+    appliances.async_setup_type(
+        "shutter", build_cover_no_pos, async_add_devices, update_before_add=True
+    )
+
+
+def build_cover_w_pos(tis_api: TISApi, cover: Appliance) -> "TISCoverWPos":
+    """Create the entity of a motor appliance."""
+    return TISCoverWPos(
+        tis_api=tis_api,
+        cover_name=cover.name,
+        channel_number=cover.channels[0],
+        device_id=cover.device_id,
+        gateway=cover.gateway,
+    )
+
+
+def build_cover_no_pos(tis_api: TISApi, cover: Appliance) -> "TISCoverNoPos":
+    """Create the entity of a shutter appliance."""
+    return TISCoverNoPos(
+        tis_api=tis_api,
+        cover_name=cover.name,
+        up_channel_number=cover.channels[0],
+        down_channel_number=cover.channels[1],
+        device_id=cover.device_id,
+        gateway=cover.gateway,
+    )
+
+
+class TISCoverWPos(TISEntityMixin, CoverEntity):
     """Representation of a TIS cover with position feedback."""
 
     def __init__(
@@ -105,60 +83,57 @@ class TISCoverWPos(CoverEntity):
         self.api = tis_api
         self.gateway = gateway
         self.device_id = device_id
+        self.device_address = pack_device_id(device_id)
         self.channel_number = int(channel_number)
         self._attr_name = cover_name
         self._attr_is_closed = None
         self._attr_current_cover_position = None
         self._attr_device_class = CoverDeviceClass.SHUTTER
         self._attr_unique_id = f"{self._attr_name}_{self.channel_number}"
-        self.listener = None
         ##############################################
-        self.update_packet: TISPacket = handler.generate_control_update_packet(self)
-        self.generate_cover_packet = handler.generate_light_control_packet
+        self.update_packet: TISPacket = device_update_packet(self)
+        # slider bursts only send the latest position once the bus is free
+        self.position_commands = CommandCoalescer(self.send_position)
 
     async def async_added_to_hass(self) -> None:
         """Run when entity about to be added to hass."""
 
         @callback
-        async def handle_event(event: Event):
+        def handle_event(event: Event) -> None:
             """Handle the event."""
-            # check if event is for this switch
-            if event.event_type == str(self.device_id):
-                if event.data["feedback_type"] == "control_response":
-                    logging.warning("channel number for cover: %s", self.channel_number)
-                    channel_value = event.data["additional_bytes"][2]
-                    channel_number = event.data["channel_number"]
-                    if int(channel_number) == self.channel_number:
-                        self._attr_is_closed = channel_value == 0
-                        self._attr_current_cover_position = channel_value
-                    self.async_write_ha_state()
-                elif event.data["feedback_type"] == "binary_feedback":
-                    n_bytes = ceil(event.data["additional_bytes"][0] / 8)
-                    channels_status = "".join(
-                        int_to_8_bit_binary(event.data["additional_bytes"][i])
-                        for i in range(1, n_bytes + 1)
-                    )
-                    if channels_status[self.channel_number - 1] == "0":
-                        self._attr_is_closed = True
-                    self.async_write_ha_state()
-                elif event.data["feedback_type"] == "update_response":
-                    additional_bytes = event.data["additional_bytes"]
-                    self._attr_current_cover_position = additional_bytes[
-                        self.channel_number
-                    ]
-                    self._attr_is_closed = self._attr_current_cover_position == 0
-                    self._attr_state = (
-                        STATE_CLOSING if self._attr_is_closed else STATE_OPENING
-                    )
-                elif event.data["feedback_type"] == "offline_device":
-                    self._attr_state = STATE_UNKNOWN
-                    self._attr_is_closed = None
-                    self._attr_current_cover_position = None
-
-            await self.async_update_ha_state(True)
-
-        self.listener = self.hass.bus.async_listen(str(self.device_id), handle_event)
-        _ = await self.api.protocol.sender.send_packet(self.update_packet)
+            if event.data["feedback_type"] == "control_response":
+                logging.warning("channel number for cover: %s", self.channel_number)
+                channel_value = self.device_state.value(self.channel_number)
+                self._attr_is_closed = channel_value == 0
+                self._attr_current_cover_position = channel_value
+                self.reconcile_feedback()
+            elif event.data["feedback_type"] == "binary_feedback":
+                if not self.device_state.is_on(self.channel_number):
+                    self._attr_is_closed = True
+            elif event.data["feedback_type"] == "update_response":
+                self._attr_current_cover_position = self.device_state.value(
+                    self.channel_number
+                )
+                self._attr_is_closed = self._attr_current_cover_position == 0
+                self._attr_state = (
+                    STATE_CLOSING if self._attr_is_closed else STATE_OPENING
+                )
+                self.reconcile_feedback()
+
+            self.async_schedule_state_write()
+
+        dispatcher = self.runtime_data.dispatcher
+        self.async_on_remove(
+            dispatcher.async_subscribe(
+                self.device_address,
+                COVER_FEEDBACK_TYPES,
+                handle_event,
+                self.channel_number,
+            )
+        )
+        self.runtime_data.state_sync.async_request_update(
+            self.gateway, self.device_address, self.update_packet
+        )
 
     @property
     def name(self) -> str:
@@ -187,41 +162,54 @@ class TISCoverWPos(CoverEntity):
 
     async def async_open_cover(self, **kwargs: Any) -> None:
         """Open the cover."""
-        packet = self.generate_cover_packet(self, 100)
-        ack_status = await self.api.protocol.sender.send_packet_with_ack(packet)
-        if ack_status:
-            self._attr_is_closed = False
-            self._attr_current_cover_position = 100
-        else:
-            self._attr_is_closed = None
-            self._attr_current_cover_position = None
-
-        self.async_write_ha_state()
+        await self.async_move_to(100)
 
     async def async_close_cover(self, **kwargs: Any) -> None:
         """Close cover."""
-        packet = self.generate_cover_packet(self, 0)
-        ack_status = await self.api.protocol.sender.send_packet_with_ack(packet)
-        if ack_status:
-            self._attr_is_closed = True
-            self._attr_current_cover_position = 0
-        else:
-            self._attr_is_closed = False
-            self._attr_current_cover_position = None
+        await self.async_move_to(0)
 
     async def async_set_cover_position(self, **kwargs: Any) -> None:
         """Move the cover to a specific position."""
-        packet = self.generate_cover_packet(self, kwargs[ATTR_POSITION])
-        ack_status = await self.api.protocol.sender.send_packet_with_ack(packet)
+        await self.async_move_to(kwargs[ATTR_POSITION])
+
+    async def async_move_to(self, position: int) -> None:
+        """Move to a position, coalescing with commands already in flight."""
+        if self.optimistic:
+            self.apply_position_ack(position, True)
+            self.async_write_optimistic_state()
+        position, ack_status = await self.position_commands.async_send(position)
+        self.reconcile_ack(ack_status)
+        self.apply_position_ack(position, ack_status)
+        self.async_write_ha_state()
+
+    def apply_position_ack(self, position: int, ack_status: bool) -> None:
+        """Update the cover attributes from the ACK of a position packet."""
         if ack_status:
-            self._attr_is_closed = kwargs[ATTR_POSITION] == 0
-            self._attr_current_cover_position = kwargs[ATTR_POSITION]
+            self._attr_is_closed = position == 0
+            self._attr_current_cover_position = position
         else:
             self._attr_is_closed = None
             self._attr_current_cover_position = None
 
+    def optimistic_snapshot(self) -> tuple:
+        """Return the attributes an optimistic write is reconciled on."""
+        return (self._attr_current_cover_position,)
+
+    def state_snapshot(self) -> tuple:
+        """Return the attributes feedback can change."""
+        return (
+            self._attr_state,
+            self._attr_is_closed,
+            self._attr_current_cover_position,
+        )
+
+    async def send_position(self, position: int) -> bool:
+        """Send a position (0-100) to the channel, return the ACK."""
+        packet = handler.generate_light_control_packet(self, position)
+        return await self.runtime_data.ack_tracker.send_packet_with_ack(packet)
+
 
-class TISCoverNoPos(CoverEntity):
+class TISCoverNoPos(TISEntityMixin, CoverEntity):
     """Representation of a TIS cover without position feedback."""
 
     def __init__(
@@ -237,6 +225,7 @@ class TISCoverNoPos(CoverEntity):
         self.api = tis_api
         self.gateway = gateway
         self.device_id = device_id
+        self.device_address = pack_device_id(device_id)
         self.up_channel_number = int(up_channel_number)
         self.down_channel_number = int(down_channel_number)
         self._attr_name = cover_name
@@ -248,7 +237,6 @@ class TISCoverNoPos(CoverEntity):
         self._attr_is_closed = None
         self._attr_device_class = CoverDeviceClass.WINDOW
         self.last_status = STATE_OPENING
-        self.listener = None
         # self.up_update_packet: TISPacket = handler.generate_control_update_packet(self)
         # self.up_update_packet: TISPacket = handler.generate_control_update_packet(self)
 
@@ -256,36 +244,41 @@ class TISCoverNoPos(CoverEntity):
         """Subscribe to events."""
 
         @callback
-        async def handle_event(event: Event):
+        def handle_event(event: Event) -> None:
             """Handle the event."""
-            # check if event is for this switch
-            if event.event_type == str(self.device_id):
-                if event.data["feedback_type"] == "control_response":
-                    channel_value = event.data["additional_bytes"][2]
-                    channel_number = event.data["channel_number"]
-                    if int(channel_number) == self.up_channel_number:
-                        if channel_value != 0:
-                            self._attr_is_closed = False
-                            self.last_status = STATE_OPENING
-                    elif int(channel_number) == self.down_channel_number:
-                        if channel_value != 0:
-                            self._attr_is_closed = True
-                            self.last_status = STATE_CLOSING
-
-                    else:
-                        self._attr_is_closed = False if self.last_status == STATE_OPENING else True
-
-                # elif event.data["feedback_type"] == "update_response":
-                #     additional_bytes = event.data["additional_bytes"]
-                #     channel_status = int(additional_bytes[self.channel_number])
-                #     self._state = STATE_ON if channel_status > 0 else STATE_OFF
-                # elif event.data["feedback_type"] == "offline_device":
-                #     self._state = STATE_UNKNOWN
-
-            await self.async_update_ha_state(True)
-            self.schedule_update_ha_state()
-
-        self.listener = self.hass.bus.async_listen(str(self.device_id), handle_event)
+            if event.data["feedback_type"] == "control_response":
+                channel_value = event.data["additional_bytes"][2]
+                channel_number = event.data["channel_number"]
+                if int(channel_number) == self.up_channel_number:
+                    if channel_value != 0:
+                        self._attr_is_closed = False
+                        self.last_status = STATE_OPENING
+                elif int(channel_number) == self.down_channel_number:
+                    if channel_value != 0:
+                        self._attr_is_closed = True
+                        self.last_status = STATE_CLOSING
+
+                else:
+                    self._attr_is_closed = False if self.last_status == STATE_OPENING else True
+
+            # elif event.data["feedback_type"] == "update_response":
+            #     additional_bytes = event.data["additional_bytes"]
+            #     channel_status = int(additional_bytes[self.channel_number])
+            #     self._state = STATE_ON if channel_status > 0 else STATE_OFF
+            # elif event.data["feedback_type"] == "offline_device":
+            #     self._state = STATE_UNKNOWN
+
+            self.async_schedule_state_write()
+
+        dispatcher = self.runtime_data.dispatcher
+        self.async_on_remove(
+            dispatcher.async_subscribe(
+                self.device_address,
+                ("control_response",
+                ),
+                handle_event,
+            )
+        )
         # _ = await self.api.protocol.sender.send_packet(self.update_packet)
 
     @property
@@ -315,11 +308,15 @@ class TISCoverNoPos(CoverEntity):
         """Return a unique ID."""
         return self._attr_unique_id
 
+    def state_snapshot(self) -> tuple:
+        """Return the attributes feedback can change."""
+        return (self._attr_state, self._attr_is_closed)
+
     async def async_open_cover(self, **kwargs: Any) -> None:
         """Open the cover."""
         up_packet, down_packet = handler.generate_no_pos_cover_packet(self, "open")
         # we only need to send the up packet here
-        ack_status = await self.api.protocol.sender.send_packet_with_ack(up_packet)
+        ack_status = await self.runtime_data.ack_tracker.send_packet_with_ack(up_packet)
         if ack_status:
             self._attr_is_closed = False
             self.last_status = STATE_OPENING
@@ -331,7 +328,7 @@ class TISCoverNoPos(CoverEntity):
         """Close cover."""
         up_packet, down_packet = handler.generate_no_pos_cover_packet(self, "close")
         # we only need to send the down packet here
-        ack_status = await self.api.protocol.sender.send_packet_with_ack(down_packet)
+        ack_status = await self.runtime_data.ack_tracker.send_packet_with_ack(down_packet)
         if ack_status:
             self._attr_is_closed = True
             self.last_status = STATE_CLOSING
@@ -344,7 +341,7 @@ class TISCoverNoPos(CoverEntity):
         up_packet, down_packet = handler.generate_no_pos_cover_packet(self, "stop")
         # we need to send both packets here
         if self._attr_is_closed:
-            ack_status = await self.api.protocol.sender.send_packet_with_ack(
+            ack_status = await self.runtime_data.ack_tracker.send_packet_with_ack(
                 down_packet
             )
             if ack_status:
@@ -355,7 +352,7 @@ class TISCoverNoPos(CoverEntity):
                 self._attr_is_closed = None
 
         elif not self._attr_is_closed:
-            ack_status = await self.api.protocol.sender.send_packet_with_ack(up_packet)
+            ack_status = await self.runtime_data.ack_tracker.send_packet_with_ack(up_packet)
             if ack_status:
                 self._attr_state = self.last_status
                 self._attr_is_closed = False if self.last_status == STATE_OPENING else True
@@ -0,0 +1,28 @@
+"""Diagnostics support for TISControl."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+
+from . import TISConfigEntry
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: TISConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    runtime_data = entry.runtime_data
+    return {
+        "options": dict(entry.options),
+        "ack_tracker": runtime_data.ack_tracker.stats,
+        "optimistic": runtime_data.optimistic_stats.as_dict(),
+        "state_sync": runtime_data.state_sync.progress,
+        "health_polls": runtime_data.health_coordinator.stats,
+        "state_writes": runtime_data.write_stats.as_dict(),
+        "liveness": runtime_data.liveness.stats,
+        "gateways": runtime_data.gateway_sender.stats,
+        "appliances": runtime_data.appliances.stats,
+        "discovered_devices": len(runtime_data.device_inventory.devices),
+    }
@@ -0,0 +1,190 @@
+"""Event driven discovery of TIS devices and their persisted inventory."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterator, Callable
+from typing import Any
+
+from TISControlProtocol.api import TISApi
+from TISControlProtocol.Protocols.udp.ProtocolHandler import TISPacket
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    DEVICE_INVENTORY_SAVE_DELAY,
+    DEVICE_INVENTORY_STORE_VERSION,
+    DISCOVERY_BROADCASTS,
+    DISCOVERY_MIN_BROADCASTS,
+    DISCOVERY_QUIET_TIME,
+    DISCOVERY_REFRESH_INTERVAL,
+    DOMAIN,
+)
+from .gateways import TISGatewaySender
+from .packets import handler
+
+
+class DiscoveredDevices(list):
+    """The list the protocol appends discovery replies to.
+
+    The protocol only appends a reply whose device is not in the list yet,
+    so every scan starts from an empty list of its own: each device that
+    replies during the scan reaches the listeners, whether it was discovered
+    before or not. The inventory keeps the devices across scans.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the list."""
+        super().__init__()
+        self.listeners: set[Callable[[dict[str, Any]], None]] = set()
+
+    def append(self, info: dict[str, Any]) -> None:
+        """Store a reply and notify the listeners."""
+        super().append(info)
+        for listener in self.listeners:
+            listener(info)
+
+
+def discovered_devices(api: TISApi) -> DiscoveredDevices:
+    """Return the list of the running scan, or install an empty one."""
+    data = api.hass.data[api.domain]
+    devices = data.get("discovered_devices")
+    if not isinstance(devices, DiscoveredDevices) or not devices.listeners:
+        devices = data["discovered_devices"] = DiscoveredDevices()
+    return devices
+
+
+async def async_discover_devices(
+    api: TISApi, gateway_sender: TISGatewaySender, packet: TISPacket
+) -> AsyncIterator[dict[str, Any]]:
+    """Broadcast discovery packets and yield each responding device once.
+
+    A new broadcast goes out whenever no new device replied for
+    DISCOVERY_QUIET_TIME. The scan ends as soon as a broadcast after the
+    first DISCOVERY_MIN_BROADCASTS brings no new device, or after
+    DISCOVERY_BROADCASTS broadcasts. A scan started while another one runs
+    shares its list, starting with the replies it already got.
+    """
+    devices = discovered_devices(api)
+    replies: asyncio.Queue[dict[str, Any]] = asyncio.Queue()
+    for info in devices:
+        replies.put_nowait(info)
+    listener = replies.put_nowait
+    devices.listeners.add(listener)
+    loop = asyncio.get_running_loop()
+    seen: set[tuple[int, ...]] = set()
+    try:
+        for broadcast in range(DISCOVERY_BROADCASTS):
+            gateway_sender.async_broadcast(packet)
+            grew = False
+            deadline = loop.time() + DISCOVERY_QUIET_TIME
+            while (remaining := deadline - loop.time()) > 0:
+                try:
+                    async with asyncio.timeout(remaining):
+                        info = await replies.get()
+                except TimeoutError:
+                    break
+                if (device_id := tuple(info["device_id"])) in seen:
+                    continue
+                seen.add(device_id)
+                grew = True
+                deadline = loop.time() + DISCOVERY_QUIET_TIME
+                yield info
+            if not grew and broadcast + 1 >= DISCOVERY_MIN_BROADCASTS:
+                break
+    finally:
+        devices.listeners.discard(listener)
+
+
+class TISDeviceInventory:
+    """Every device discovery has found, persisted across restarts.
+
+    Each device is kept once by device_id with its type, its gateway and
+    when it was first and last seen, in the form the scan endpoint returns.
+    Once the inventory is not empty, a scan returns it right away and
+    refreshes it with a background discovery, at most once per
+    DISCOVERY_REFRESH_INTERVAL, so repeated scans cost a lookup.
+    """
+
+    def __init__(
+        self, hass: HomeAssistant, api: TISApi, gateway_sender: TISGatewaySender
+    ) -> None:
+        """Initialize the inventory."""
+        self.hass = hass
+        self.api = api
+        self.gateway_sender = gateway_sender
+        self.discovery_packet = handler.generate_discovery_packet()
+        self.devices: dict[tuple[int, ...], dict[str, Any]] = {}
+        self._store: Store[list[dict[str, Any]]] = Store(
+            hass, DEVICE_INVENTORY_STORE_VERSION, f"{DOMAIN}.discovered_devices"
+        )
+        self._loaded = False
+        self._refresh: asyncio.Task | None = None
+        self._refreshed_at: float | None = None
+
+    async def async_load(self) -> None:
+        """Load the persisted inventory once."""
+        if self._loaded:
+            return
+        self._loaded = True
+        for device in await self._store.async_load() or ():
+            self.devices[tuple(device["device_id"])] = device
+
+    @callback
+    def _async_seen(self, info: dict[str, Any]) -> dict[str, Any]:
+        """Record a discovery reply, return the device's inventory entry."""
+        now = dt_util.utcnow().isoformat()
+        device_type = list(info["device_type"])
+        device = self.devices.get(device_id := tuple(info["device_id"]))
+        if device is None or device["device_type_code"] != device_type:
+            device = self.devices[device_id] = {
+                "device_id": list(device_id),
+                "device_type_code": device_type,
+                "device_type_name": self.api.devices_dict.get(
+                    tuple(device_type), device_type
+                ),
+                "first_seen": now,
+            }
+        device["gateway"] = info["source_ip"]
+        device["last_seen"] = now
+        return device
+
+    async def async_scan(self) -> AsyncIterator[dict[str, Any]]:
+        """Run a discovery, yielding the inventory entry of each device."""
+        self._refreshed_at = self.hass.loop.time()
+        async for info in async_discover_devices(
+            self.api, self.gateway_sender, self.discovery_packet
+        ):
+            yield self._async_seen(info)
+        self._store.async_delay_save(
+            lambda: list(self.devices.values()), DEVICE_INVENTORY_SAVE_DELAY
+        )
+
+    @callback
+    def async_refresh(self) -> None:
+        """Start a background discovery unless one ran recently."""
+        if self._refresh is not None or (
+            self._refreshed_at is not None
+            and self.hass.loop.time() - self._refreshed_at
+            < DISCOVERY_REFRESH_INTERVAL
+        ):
+            return
+        self._refresh = self.hass.async_create_background_task(
+            self._async_refresh(), "tis discovery refresh"
+        )
+
+    async def _async_refresh(self) -> None:
+        """Refresh the inventory with a discovery."""
+        try:
+            async for _ in self.async_scan():
+                pass
+        finally:
+            self._refresh = None
+
+    @callback
+    def async_stop(self) -> None:
+        """Cancel a running background discovery."""
+        if self._refresh is not None:
+            self._refresh.cancel()
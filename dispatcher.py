@@ -0,0 +1,217 @@
+"""Central routing of TIS feedback events to the entities that need them."""
+
+from __future__ import annotations
+
+from collections.abc import Callable, Coroutine, Iterable, Mapping
+from dataclasses import dataclass, field
+import logging
+from math import ceil
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.const import MATCH_ALL
+from homeassistant.core import CALLBACK_TYPE, Event, HassJob, HomeAssistant, callback
+
+if TYPE_CHECKING:
+    from .liveness import TISLiveness
+
+_LOGGER = logging.getLogger(__name__)
+
+DispatchKey = tuple[int, int | None, str]
+FeedbackHandler = Callable[[Event], Coroutine[Any, Any, None] | None]
+
+def pack_device_id(device_id: list[int]) -> int:
+    """Pack a TIS [subnet, device] pair into a single 16-bit address."""
+    return (device_id[0] << 8) | device_id[1]
+
+
+def decode_binary_feedback(additional_bytes: list[int]) -> int:
+    """Decode a binary_feedback payload into a channel bitmask.
+
+    The first byte is the channel count, followed by one bit per channel,
+    least significant bit first, so the bytes are the mask in little endian
+    order: bit (channel_number - 1) of the result is set when that channel
+    is on.
+    """
+    n_bytes = ceil(additional_bytes[0] / 8)
+    mask = 0
+    for i in range(n_bytes):
+        mask |= additional_bytes[i + 1] << (8 * i)
+    return mask
+
+
+def _channel_numbers(mask: int) -> Iterable[int]:
+    """Yield the channel numbers whose bit is set in a channel bitmask."""
+    while mask:
+        low_bit = mask & -mask
+        yield low_bit.bit_length()
+        mask ^= low_bit
+
+
+@dataclass(slots=True)
+class DeviceState:
+    """Latest known channel state of one TIS device.
+
+    channels holds the last reported value of every channel (index
+    channel_number - 1), mask has bit (channel_number - 1) set while that
+    channel is on, and known marks the channels reported at least once.
+    """
+
+    channels: bytearray = field(default_factory=bytearray)
+    mask: int = 0
+    known: int = 0
+    last_seen: float | None = None
+
+    def value(self, channel_number: int) -> int:
+        """Return the last reported value of a channel."""
+        return self.channels[channel_number - 1]
+
+    def is_on(self, channel_number: int) -> bool:
+        """Return True if a channel was last reported on."""
+        return bool(self.mask >> (channel_number - 1) & 1)
+
+    def apply_update_response(self, additional_bytes: list[int]) -> None:
+        """Store the value of every channel from an update_response."""
+        count = additional_bytes[0]
+        self.channels[:] = bytes(additional_bytes[1 : count + 1])
+        self.mask = sum(
+            1 << index for index, value in enumerate(self.channels) if value
+        )
+        self.known = (1 << count) - 1
+
+    def apply_control_response(self, channel_number: int, value: int) -> None:
+        """Store the value of one channel from a control_response."""
+        index = channel_number - 1
+        if index >= len(self.channels):
+            self.channels.extend(bytes(index + 1 - len(self.channels)))
+        self.channels[index] = value
+        bit = 1 << index
+        self.mask = self.mask | bit if value else self.mask & ~bit
+        self.known |= bit
+
+    def apply_binary_feedback(self, additional_bytes: list[int]) -> int:
+        """Store the on/off mask of a binary_feedback, return what changed.
+
+        The result has a bit set for every channel whose on/off state
+        changed or was not known before. Channels reported off get value 0.
+        """
+        channel_bits = (1 << additional_bytes[0]) - 1
+        mask = decode_binary_feedback(additional_bytes) & channel_bits
+        changed = ((self.mask ^ mask) | ~self.known) & channel_bits
+        self.mask = self.mask & ~channel_bits | mask
+        self.known |= channel_bits
+        for channel_number in _channel_numbers(changed & ~mask):
+            if channel_number <= len(self.channels):
+                self.channels[channel_number - 1] = 0
+        return changed
+
+
+@callback
+def _is_tis_feedback(event_data: Mapping[str, Any]) -> bool:
+    """Return True if the event carries TIS feedback."""
+    return "feedback_type" in event_data and "device_id" in event_data
+
+
+class TISDispatcher:
+    """Route TIS feedback events to subscribed entities.
+
+    A single bus listener is registered per config entry. Entities subscribe
+    with a (device_address, channel_number, feedback_type) key, where the
+    address is the packed int from pack_device_id, and the dispatcher
+    looks the key up in a dict index, so each packet only wakes the entities
+    that asked for it. A channel_number of None subscribes to every channel
+    of the device for that feedback type.
+
+    Every packet also updates the DeviceState of its device once, before
+    any entity runs, so entities read their channel from the cache instead
+    of decoding the payload themselves. Device-wide packets are delivered to
+    channel subscribers too: update_response to every channel, and
+    binary_feedback only to the channels whose on/off state changed.
+    """
+
+    def __init__(self, hass: HomeAssistant, liveness: TISLiveness) -> None:
+        """Initialize the dispatcher."""
+        self.hass = hass
+        self.liveness = liveness
+        self._subscribers: dict[DispatchKey, list[HassJob]] = {}
+        self._devices: dict[int, DeviceState] = {}
+
+    @callback
+    def device_state(self, device_address: int) -> DeviceState:
+        """Return the cached state of a device, creating an empty one."""
+        if (state := self._devices.get(device_address)) is None:
+            state = self._devices[device_address] = DeviceState()
+        return state
+
+    @callback
+    def async_setup(self) -> CALLBACK_TYPE:
+        """Start listening on the bus, return the function that stops it."""
+        return self.hass.bus.async_listen(
+            MATCH_ALL, self._async_handle_event, event_filter=_is_tis_feedback
+        )
+
+    @callback
+    def async_subscribe(
+        self,
+        device_address: int,
+        feedback_types: Iterable[str],
+        target: FeedbackHandler,
+        channel_number: int | None = None,
+    ) -> CALLBACK_TYPE:
+        """Subscribe target to feedback of a device, return the unsubscribe."""
+        job = HassJob(target, f"tis dispatch {device_address:#06x}")
+        keys = [
+            (device_address, channel_number, feedback_type)
+            for feedback_type in feedback_types
+        ]
+        for key in keys:
+            self._subscribers.setdefault(key, []).append(job)
+
+        @callback
+        def async_unsubscribe() -> None:
+            """Remove the subscription from the index."""
+            for key in keys:
+                jobs = self._subscribers.get(key)
+                if jobs is None or job not in jobs:
+                    continue
+                jobs.remove(job)
+                if not jobs:
+                    del self._subscribers[key]
+
+        return async_unsubscribe
+
+    @callback
+    def _async_handle_event(self, event: Event) -> None:
+        """Dispatch a feedback event to the matching subscribers."""
+        data = event.data
+        device_key = pack_device_id(data["device_id"])
+        feedback_type = data["feedback_type"]
+        state = self.device_state(device_key)
+        state.last_seen = event.time_fired_timestamp
+        if self.liveness.async_seen(device_key):
+            # back from offline: report every channel again
+            state.known = 0
+        channel_numbers: Iterable[int]
+        if feedback_type == "update_response":
+            state.apply_update_response(data["additional_bytes"])
+            channel_numbers = range(1, len(state.channels) + 1)
+        elif feedback_type == "binary_feedback":
+            channel_numbers = _channel_numbers(
+                state.apply_binary_feedback(data["additional_bytes"])
+            )
+        else:
+            channel_number = data.get("channel_number")
+            if channel_number is None:
+                channel_numbers = ()
+            else:
+                channel_numbers = (int(channel_number),)
+                if feedback_type == "control_response":
+                    state.apply_control_response(
+                        int(channel_number), data["additional_bytes"][2]
+                    )
+        jobs = list(self._subscribers.get((device_key, None, feedback_type), ()))
+        for channel_number in channel_numbers:
+            jobs.extend(
+                self._subscribers.get((device_key, channel_number, feedback_type), ())
+            )
+        for job in jobs:
+            self.hass.async_run_hass_job(job, event)
@@ -1,39 +1,223 @@
-"""Base class for all entities using the DataUpdateCoordinator."""
+"""Base classes and helpers shared by the TIS entities."""
+
+from __future__ import annotations
+
+from collections import Counter
+from dataclasses import dataclass, field
+import logging
+from typing import TYPE_CHECKING, Any
 
 from homeassistant.core import callback
-from homeassistant.helpers.update_coordinator import (
-    CoordinatorEntity,
-    DataUpdateCoordinator,
-)
+from homeassistant.helpers.debounce import Debouncer
+from homeassistant.helpers.entity import Entity
+
+from .const import CONF_OPTIMISTIC, CONF_WRITE_COOLDOWN, STATE_WRITE_COOLDOWN
+from .dispatcher import DeviceState, pack_device_id
+from .packets import PacketTarget, handler
+
+if TYPE_CHECKING:
+    from TISControlProtocol.Protocols.udp.ProtocolHandler import TISPacket
+
+    from . import TISData
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@dataclass
+class OptimisticStats:
+    """Outcome counters of optimistic state writes, per entity_id."""
+
+    divergences: Counter[str] = field(default_factory=Counter)
+    reverts: Counter[str] = field(default_factory=Counter)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the counters for diagnostics."""
+        return {
+            "divergences": sum(self.divergences.values()),
+            "reverts": sum(self.reverts.values()),
+            "divergences_by_entity": dict(self.divergences),
+            "reverts_by_entity": dict(self.reverts),
+        }
+
+
+@dataclass
+class WriteStats:
+    """State writes done and skipped as no-ops, per entity_id."""
+
+    written: Counter[str] = field(default_factory=Counter)
+    skipped: Counter[str] = field(default_factory=Counter)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the counters for diagnostics."""
+        return {
+            "written": sum(self.written.values()),
+            "skipped": sum(self.skipped.values()),
+            "skipped_by_entity": dict(self.skipped),
+        }
+
+
+class TISEntityMixin:
+    """Access to the TIS runtime data of the entity's config entry.
+
+    Also implements the optimistic mode: with the optimistic option set,
+    entities write their target state before the ACK arrives, remember a
+    snapshot of it, and reconcile that snapshot with the ACK and the next
+    feedback packet.
+
+    Feedback handlers write through async_write_state_if_changed, which
+    skips the write when state_snapshot is the same as at the last write,
+    or through async_schedule_state_write, which also writes at most once
+    per write_cooldown seconds and always flushes the latest state at the
+    end of the cooldown.
+    """
+
+    _optimistic_target: tuple | None = None
+    _write_debouncer: Debouncer | None = None
+    _written_snapshot: tuple | None = None
+
+    @property
+    def runtime_data(self) -> TISData:
+        """Return the runtime data of the config entry."""
+        return self.platform.config_entry.runtime_data
+
+    @property
+    def device_state(self) -> DeviceState:
+        """Return the cached channel state of the entity's device."""
+        return self.runtime_data.dispatcher.device_state(self.device_address)
+
+    @property
+    def optimistic(self) -> bool:
+        """Return True if state is written before the ACK arrives."""
+        return self.platform.config_entry.options.get(CONF_OPTIMISTIC, False)
+
+    def state_snapshot(self) -> tuple | None:
+        """Return the attributes feedback can change, None to always write."""
+        return None
+
+    @callback
+    def async_set_probe(self, packet: TISPacket) -> None:
+        """Probe the entity's device with packet while it is offline."""
+        self.async_on_remove(
+            self.runtime_data.liveness.async_add_probe(self.device_address, packet)
+        )
+
+    @callback
+    def async_write_ha_state(self) -> None:
+        """Write the state and remember the snapshot it was written with.
+
+        The availability of the entity follows the liveness of its device.
+        """
+        available = self.runtime_data.liveness.is_available(self.device_address)
+        if available != self._attr_available:
+            self._attr_available = available
+        self._written_snapshot = self.state_snapshot()
+        self.runtime_data.write_stats.written[self.entity_id] += 1
+        super().async_write_ha_state()
+
+    def _state_unchanged(self) -> bool:
+        """Return True, counting a skip, if a write would be a no-op."""
+        snapshot = self.state_snapshot()
+        if snapshot is None or snapshot != self._written_snapshot:
+            return False
+        self.runtime_data.write_stats.skipped[self.entity_id] += 1
+        return True
 
+    @callback
+    def async_write_state_if_changed(self) -> None:
+        """Write the state unless it is the same as at the last write."""
+        if not self._state_unchanged():
+            self.async_write_ha_state()
 
-class BaseSensorEntity(CoordinatorEntity):
-    """Base class for all entities using the DataUpdateCoordinator."""
+    @callback
+    def async_schedule_state_write(self) -> None:
+        """Write the state now, or once the write cooldown has passed."""
+        if self._state_unchanged():
+            return
+        cooldown = self.platform.config_entry.options.get(
+            CONF_WRITE_COOLDOWN, STATE_WRITE_COOLDOWN
+        )
+        if not cooldown:
+            self.async_write_ha_state()
+            return
+        if self._write_debouncer is None:
+            self._write_debouncer = Debouncer(
+                self.hass,
+                _LOGGER,
+                cooldown=cooldown,
+                immediate=True,
+                function=self.async_write_state_if_changed,
+            )
+            self.async_on_remove(self._write_debouncer.async_shutdown)
+        self._write_debouncer.cooldown = cooldown
+        self._write_debouncer.async_schedule_call()
 
-    def __init__(self, coordinator, name: str, device_id: list) -> None:
+    def optimistic_snapshot(self) -> tuple:
+        """Return the attributes an optimistic write is reconciled on."""
+        raise NotImplementedError
+
+    @callback
+    def async_write_optimistic_state(self) -> None:
+        """Write the target state now and remember it for reconciliation."""
+        self._optimistic_target = self.optimistic_snapshot()
+        self.async_write_ha_state()
+
+    @callback
+    def reconcile_ack(self, ack_status: bool) -> None:
+        """Count a revert if an optimistically written command was not ACKed."""
+        if self._optimistic_target is not None and not ack_status:
+            self._optimistic_target = None
+            self.runtime_data.optimistic_stats.reverts[self.entity_id] += 1
+
+    @callback
+    def reconcile_feedback(self) -> None:
+        """Count a divergence if feedback contradicts the optimistic target."""
+        if self._optimistic_target is None:
+            return
+        if self.optimistic_snapshot() != self._optimistic_target:
+            self.runtime_data.optimistic_stats.divergences[self.entity_id] += 1
+        self._optimistic_target = None
+
+
+class BaseSensorEntity(TISEntityMixin, Entity):
+    """Base class for all TIS health sensor entities.
+
+    The device is polled by the config entry's TISHealthCoordinator while
+    the entity is added; the readings arrive as health_feedback events. The
+    same health request probes the device while it is offline.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        device_id: list,
+        gateway: str,
+    ) -> None:
         """Initialize the entity."""
-        super().__init__(coordinator)
-        self.coordinator: DataUpdateCoordinator = coordinator
         self._attr_name: str = name
         self._state = None
         self._device_id: list = device_id
+        self.device_address: int = pack_device_id(device_id)
+        self.gateway = gateway
 
     async def async_added_to_hass(self) -> None:
-        """Register for updates from the coordinator."""
+        """Register the device with the health coordinator."""
         await super().async_added_to_hass()
         self.async_on_remove(
-            self.coordinator.async_add_listener(self._handle_coordinator_update)
+            self.runtime_data.health_coordinator.async_add_device(
+                self.gateway, self._device_id
+            )
+        )
+        self.async_set_probe(
+            handler.generate_health_sensor_update_packet(
+                entity=PacketTarget(
+                    self._device_id, self.runtime_data.api, self.gateway
+                )
+            )
         )
 
-    @callback
-    def _handle_coordinator_update(self) -> None:
-        """Handle updated data from the coordinator."""
-        self._update_state(self.coordinator.data)
-        self.async_write_ha_state()
-
-    def _update_state(self, data):
-        """Update the state based on the data."""
-        raise NotImplementedError
+    def state_snapshot(self) -> tuple:
+        """Return the attributes feedback can change."""
+        return (self._state,)
 
     @property
     def should_poll(self) -> bool:
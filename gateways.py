@@ -0,0 +1,185 @@
+"""Per-gateway outbound scheduling of TIS packets."""
+
+from __future__ import annotations
+
+import asyncio
+from collections import Counter
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from enum import IntEnum
+import heapq
+import itertools
+import logging
+from typing import Any
+
+from TISControlProtocol.api import TISApi
+from TISControlProtocol.Protocols.udp.ProtocolHandler import TISPacket
+
+from homeassistant.core import HomeAssistant, callback
+
+from .const import (
+    GATEWAY_DISCOVERY_INTERVAL,
+    GATEWAY_POLL_INTERVAL,
+    GATEWAY_SEND_INTERVAL,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+BROADCAST = "<broadcast>"
+
+
+class SendPriority(IntEnum):
+    """Outbound traffic classes, most urgent first."""
+
+    CONTROL = 0
+    RETRY = 1
+    STATE_SYNC = 2
+    POLL = 3
+    DISCOVERY = 4
+
+
+# seconds since the last packet on the gateway before a class may send
+_CLASS_INTERVALS = {
+    SendPriority.CONTROL: 0.0,
+    SendPriority.RETRY: 0.0,
+    SendPriority.STATE_SYNC: GATEWAY_SEND_INTERVAL,
+    SendPriority.POLL: GATEWAY_POLL_INTERVAL,
+    SendPriority.DISCOVERY: GATEWAY_DISCOVERY_INTERVAL,
+}
+
+QueuedPacket = tuple[SendPriority, int, TISPacket, Callable[[], bool] | None]
+
+
+@dataclass(slots=True)
+class GatewayQueue:
+    """Send queue and counters of one gateway."""
+
+    heap: list[QueuedPacket] = field(default_factory=list)
+    wake: asyncio.Event = field(default_factory=asyncio.Event)
+    worker: asyncio.Task | None = None
+    sent_at: float = float("-inf")
+    sent: Counter[SendPriority] = field(default_factory=Counter)
+    dropped: int = 0
+    errors: int = 0
+
+
+class TISGatewaySender:
+    """Schedule outbound packets per gateway by traffic class.
+
+    Packets are queued on the gateway they are addressed to, and each
+    gateway has its own worker, so gateways are paced independently and
+    throughput grows with their number. A send error only counts against its
+    own gateway; the workers of the other gateways keep going. Discovery
+    broadcasts have a lane of their own.
+
+    Within a gateway the most urgent class always goes first. Control
+    packets and ACK retries are sent as soon as they are queued; state sync,
+    poll and discovery packets wait until the gateway has been quiet for
+    their class interval, so they fill the gaps between user commands
+    instead of delaying them.
+
+    A packet may come with an on_send callback, called right before it is
+    sent; returning False drops the packet, which lets callers withdraw
+    requests that were answered while queued.
+    """
+
+    def __init__(self, hass: HomeAssistant, api: TISApi) -> None:
+        """Initialize the sender."""
+        self.hass = hass
+        self.api = api
+        self._gateways: dict[str, GatewayQueue] = {}
+        self._sequence = itertools.count()
+
+    @callback
+    def async_send(
+        self,
+        packet: TISPacket,
+        priority: SendPriority,
+        on_send: Callable[[], bool] | None = None,
+    ) -> None:
+        """Queue a packet on its gateway."""
+        self._async_queue(packet.destination_ip, packet, priority, on_send)
+
+    @callback
+    def async_broadcast(self, packet: TISPacket) -> None:
+        """Queue a discovery broadcast."""
+        self._async_queue(BROADCAST, packet, SendPriority.DISCOVERY, None)
+
+    @callback
+    def _async_queue(
+        self,
+        gateway: str,
+        packet: TISPacket,
+        priority: SendPriority,
+        on_send: Callable[[], bool] | None,
+    ) -> None:
+        """Queue a packet on a lane, waking or starting its worker."""
+        if (state := self._gateways.get(gateway)) is None:
+            state = self._gateways[gateway] = GatewayQueue()
+        # the sequence number keeps packets of one class in order
+        heapq.heappush(state.heap, (priority, next(self._sequence), packet, on_send))
+        state.wake.set()
+        if state.worker is None:
+            state.worker = self.hass.async_create_background_task(
+                self._async_gateway_worker(gateway, state),
+                f"tis gateway sender {gateway}",
+            )
+
+    async def _async_gateway_worker(self, gateway: str, state: GatewayQueue) -> None:
+        """Send the queued packets of a gateway, most urgent first."""
+        sender = self.api.protocol.sender
+        send = sender.broadcast_packet if gateway == BROADCAST else sender.send_packet
+        loop = self.hass.loop
+        try:
+            while state.heap:
+                priority, _, packet, on_send = state.heap[0]
+                delay = state.sent_at + _CLASS_INTERVALS[priority] - loop.time()
+                if delay > 0:
+                    # sleep, unless a more urgent packet arrives meanwhile
+                    state.wake.clear()
+                    try:
+                        async with asyncio.timeout(delay):
+                            await state.wake.wait()
+                    except TimeoutError:
+                        pass
+                    continue
+                heapq.heappop(state.heap)
+                if on_send is not None and not on_send():
+                    state.dropped += 1
+                    continue
+                try:
+                    await send(packet)
+                except OSError as err:
+                    state.errors += 1
+                    _LOGGER.debug("Sending to gateway %s failed: %s", gateway, err)
+                else:
+                    state.sent[priority] += 1
+                state.sent_at = loop.time()
+        finally:
+            state.worker = None
+
+    @callback
+    def async_stop(self) -> None:
+        """Cancel the workers and drop the queued packets."""
+        for state in self._gateways.values():
+            if state.worker is not None:
+                state.worker.cancel()
+            state.heap.clear()
+
+    @property
+    def stats(self) -> dict[str, dict[str, Any]]:
+        """Return the queue depth and counters of each gateway."""
+        return {
+            gateway: {
+                "queued": Counter(
+                    priority.name.lower() for priority, *_ in state.heap
+                ),
+                "sent": {
+                    priority.name.lower(): count
+                    for priority, count in state.sent.items()
+                },
+                "dropped": state.dropped,
+                "errors": state.errors,
+            }
+            for gateway, state in self._gateways.items()
+        }
@@ -1,11 +1,10 @@
 """Light platform for TIS Control."""
 
+import asyncio
 import logging
-from math import ceil
 from typing import Any
 
 from TISControlProtocol.api import TISApi
-from TISControlProtocol.BytesHelper import int_to_8_bit_binary
 from TISControlProtocol.Protocols.udp.ProtocolHandler import (
     TISPacket,
     TISProtocolHandler,
@@ -25,8 +24,15 @@ from homeassistant.helpers.entity_platform import AddEntitiesCallback
 import RPi.GPIO as GPIO  # type: ignore
 
 from . import TISConfigEntry
+from .appliances import Appliance
+from .control import CommandCoalescer, send_packets_with_ack
+from .dispatcher import pack_device_id
+from .entities import TISEntityMixin
+from .packets import device_update_packet
 
 handler = TISProtocolHandler()
+LIGHT_FEEDBACK_TYPES = ("control_response", "binary_feedback", "update_response")
+RGB_FEEDBACK_TYPES = ("control_response", "update_response")
 
 async def async_setup_entry(
     hass: HomeAssistant,
@@ -35,94 +41,54 @@ async def async_setup_entry(
 ) -> None:
     """Set up TIS Control lights."""
     tis_api: TISApi = entry.runtime_data.api
-    lights: dict = await tis_api.get_entities(platform="dimmer")
-    if lights:
-        light_entities = [
-            (
-                light_name,
-                next(iter(light["channels"][0].values())),
-                light["device_id"],
-                light["is_protected"],
-                light["gateway"],
-            )
-            for light in lights
-            for light_name, light in light.items()
-        ]
-        tis_lights = [
-            TISLight(
-                tis_api=tis_api,
-                light_name=light_name,
-                device_id=device_id,
-                channel_number=channel_number,
-                gateway=gateway,
-            )
-            for light_name, channel_number, device_id, is_protected, gateway in light_entities
-        ]
-        async_add_devices(tis_lights)
-
-    rgb_lights: dict = await tis_api.get_entities(platform="rgb")
-    if rgb_lights:
-        rgb_light_entities = [
-            (
-                light_name,
-                next(iter(light["channels"][0].values())),
-                next(iter(light["channels"][1].values())),
-                next(iter(light["channels"][2].values())),
-                light["device_id"],
-                light["is_protected"],
-                light["gateway"],
-            )
-            for light in rgb_lights
-            for light_name, light in light.items()
-        ]
-        tis_rgb_lights = [
-            TISRGBLight(
-                tis_api=tis_api,
-                light_name=light_name,
-                r_channel=r_channel,
-                g_channel=g_channel,
-                b_channel=b_channel,
-                device_id=device_id,
-                gateway=gateway,
-            )
-            for light_name, r_channel, g_channel, b_channel, device_id, is_protected, gateway in rgb_light_entities
-        ]
-        async_add_devices(tis_rgb_lights)
-
-    rgbw_lights: dict = await tis_api.get_entities(platform="rgbw")
-    if rgbw_lights:
-        rgbw_light_entities = [
-            (
-                light_name,
-                next(iter(light["channels"][0].values())),
-                next(iter(light["channels"][1].values())),
-                next(iter(light["channels"][2].values())),
-                next(iter(light["channels"][3].values())),
-                light["device_id"],
-                light["is_protected"],
-                light["gateway"],
-            )
-            for light in rgbw_lights
-            for light_name, light in light.items()
-        ]
-        tis_rgbw_lights = [
-            TISRGBWLight(
-                tis_api=tis_api,
-                light_name=light_name,
-                r_channel=r_channel,
-                g_channel=g_channel,
-                b_channel=b_channel,
-                w_channel=w_channel,
-                device_id=device_id,
-                gateway=gateway,
-            )
-            for light_name, r_channel, g_channel, b_channel, w_channel, device_id, is_protected, gateway in rgbw_light_entities
-        ]
-        async_add_devices(tis_rgbw_lights)
+    appliances = entry.runtime_data.appliances
+    appliances.async_setup_type("dimmer", build_light, async_add_devices)
+    appliances.async_setup_type("rgb", build_rgb_light, async_add_devices)
+    appliances.async_setup_type("rgbw", build_rgbw_light, async_add_devices)
     async_add_devices([TISCPUFan(tis_api)])
 
 
-class TISLight(LightEntity):
+def build_light(tis_api: TISApi, light: Appliance) -> "TISLight":
+    """Create the entity of a dimmer appliance."""
+    return TISLight(
+        tis_api=tis_api,
+        light_name=light.name,
+        device_id=light.device_id,
+        channel_number=light.channels[0],
+        gateway=light.gateway,
+    )
+
+
+def build_rgb_light(tis_api: TISApi, light: Appliance) -> "TISRGBLight":
+    """Create the entity of an RGB appliance."""
+    r_channel, g_channel, b_channel = light.channels[:3]
+    return TISRGBLight(
+        tis_api=tis_api,
+        light_name=light.name,
+        r_channel=r_channel,
+        g_channel=g_channel,
+        b_channel=b_channel,
+        device_id=light.device_id,
+        gateway=light.gateway,
+    )
+
+
+def build_rgbw_light(tis_api: TISApi, light: Appliance) -> "TISRGBWLight":
+    """Create the entity of an RGBW appliance."""
+    r_channel, g_channel, b_channel, w_channel = light.channels[:4]
+    return TISRGBWLight(
+        tis_api=tis_api,
+        light_name=light.name,
+        r_channel=r_channel,
+        g_channel=g_channel,
+        b_channel=b_channel,
+        w_channel=w_channel,
+        device_id=light.device_id,
+        gateway=light.gateway,
+    )
+
+
+class TISLight(TISEntityMixin, LightEntity):
     """Representation of a single channel TIS light."""
 
     def __init__(
@@ -137,11 +103,11 @@ class TISLight(LightEntity):
         self.api = tis_api
         self.gateway = gateway
         self.device_id = device_id
+        self.device_address = pack_device_id(device_id)
         self.channel_number = int(channel_number)
         self._attr_name = light_name
         self._attr_state = False
         self._attr_brightness = None
-        self.listener = None
         self._attr_unique_id = f"{self.name}_{self.channel_number}"
 
         self.setup_light()
@@ -151,47 +117,48 @@ class TISLight(LightEntity):
         self._attr_supported_color_modes = {ColorMode.BRIGHTNESS}
         self._attr_color_mode = ColorMode.BRIGHTNESS
         self._attr_supported_features = LightEntityFeature.TRANSITION
-        self.generate_light_packet = handler.generate_light_control_packet
-        self.update_packet: TISPacket = handler.generate_control_update_packet(self)
+        self.update_packet: TISPacket = device_update_packet(self)
+        # slider bursts only send the latest brightness once the bus is free
+        self.brightness_commands = CommandCoalescer(self.send_brightness)
 
     async def async_added_to_hass(self) -> None:
         """Run when entity about to be added to hass."""
 
         @callback
-        async def handle_event(event: Event):
+        def handle_event(event: Event) -> None:
             """Handle the event."""
-            # check if event is for this switch
-            if event.event_type == str(self.device_id):
-                if event.data["feedback_type"] == "control_response":
-                    logging.warning("channel number for light: %s", self.channel_number)
-                    channel_value = event.data["additional_bytes"][2]
-                    channel_number = event.data["channel_number"]
-                    if int(channel_number) == self.channel_number:
-                        self._attr_state = int(channel_value) != 0
-                        self._attr_brightness = int((channel_value / 100) * 255)
-                    self.async_write_ha_state()
-                elif event.data["feedback_type"] == "binary_feedback":
-                    n_bytes = ceil(event.data["additional_bytes"][0] / 8)
-                    channels_status = "".join(
-                        int_to_8_bit_binary(event.data["additional_bytes"][i])
-                        for i in range(1, n_bytes + 1)
-                    )
-                    if channels_status[self.channel_number - 1] == "0":
-                        self._attr_state = False
-                    self.async_write_ha_state()
-                elif event.data["feedback_type"] == "update_response":
-                    additional_bytes = event.data["additional_bytes"]
-                    self._attr_brightness = int(
-                        additional_bytes[self.channel_number] / 100 * 255
-                    )
-                    self._attr_state = (
-                        STATE_ON if self._attr_brightness > 0 else STATE_OFF
-                    )
-                elif event.data["feedback_type"] == "offline_device":
-                    self._attr_state = STATE_UNKNOWN
-
-        self.listener = self.hass.bus.async_listen(str(self.device_id), handle_event)
-        _ = await self.api.protocol.sender.send_packet(self.update_packet)
+            if event.data["feedback_type"] == "control_response":
+                logging.warning("channel number for light: %s", self.channel_number)
+                channel_value = self.device_state.value(self.channel_number)
+                self._attr_state = channel_value != 0
+                self._attr_brightness = int((channel_value / 100) * 255)
+                self.reconcile_feedback()
+                self.async_write_state_if_changed()
+            elif event.data["feedback_type"] == "binary_feedback":
+                if not self.device_state.is_on(self.channel_number):
+                    self._attr_state = False
+                self.async_write_state_if_changed()
+            elif event.data["feedback_type"] == "update_response":
+                self._attr_brightness = int(
+                    self.device_state.value(self.channel_number) / 100 * 255
+                )
+                self._attr_state = (
+                    STATE_ON if self._attr_brightness > 0 else STATE_OFF
+                )
+                self.reconcile_feedback()
+
+        dispatcher = self.runtime_data.dispatcher
+        self.async_on_remove(
+            dispatcher.async_subscribe(
+                self.device_address,
+                LIGHT_FEEDBACK_TYPES,
+                handle_event,
+                self.channel_number,
+            )
+        )
+        self.runtime_data.state_sync.async_request_update(
+            self.gateway, self.device_address, self.update_packet
+        )
 
     @property
     def brightness(self) -> int | None:
@@ -229,34 +196,61 @@ class TISLight(LightEntity):
             brightness_level = kwargs[ATTR_BRIGHTNESS]
         except KeyError:
             brightness_level = 255
-        packet = self.generate_light_packet(self, int((brightness_level / 255) * 100))
-        ack_status = await self.api.protocol.sender.send_packet_with_ack(packet)
-        if ack_status:
-            self._attr_state = True
-            self._attr_brightness = kwargs.get(ATTR_BRIGHTNESS, 255)
-        else:
-            # set light to unkown
-            self._attr_state = None
-            self._attr_brightness = None
-        self.async_write_ha_state()
+        await self.async_set_brightness(brightness_level)
         # self.schedule_update_ha_state()
 
     async def async_turn_off(self, **kwargs: Any) -> None:
         """Turn the light off."""
-        packet = self.generate_light_packet(self, 0)
-        ack_status = await self.api.protocol.sender.send_packet_with_ack(packet)
+        await self.async_set_brightness(0)
+        # self.schedule_update_ha_state()
+
+    async def async_set_brightness(self, brightness_level: int) -> None:
+        """Set a brightness level, writing it upfront in optimistic mode."""
+        if self.optimistic:
+            self.apply_brightness_ack(brightness_level, True)
+            self.async_write_optimistic_state()
+        brightness_level, ack_status = await self.brightness_commands.async_send(
+            brightness_level
+        )
+        self.reconcile_ack(ack_status)
+        self.apply_brightness_ack(brightness_level, ack_status)
+        self.async_write_ha_state()
+
+    async def send_brightness(self, brightness_level: int) -> bool:
+        """Send a brightness level (0-255) to the channel, return the ACK."""
+        packet = handler.generate_light_control_packet(
+            self, int((brightness_level / 255) * 100)
+        )
+        return await self.runtime_data.ack_tracker.send_packet_with_ack(packet)
+
+    def generate_state_packet(self, turn_on: bool) -> TISPacket:
+        """Generate the packet switching the light fully on or off."""
+        return handler.generate_light_control_packet(self, 100 if turn_on else 0)
+
+    def apply_state_ack(self, turn_on: bool, ack_status: bool) -> None:
+        """Update the light attributes from the ACK of a state packet."""
+        self.apply_brightness_ack(255 if turn_on else 0, ack_status)
+
+    def optimistic_snapshot(self) -> tuple:
+        """Return the attributes an optimistic write is reconciled on."""
+        return (self.is_on,)
+
+    def state_snapshot(self) -> tuple:
+        """Return the attributes feedback can change."""
+        return (self._attr_state, self._attr_brightness)
+
+    def apply_brightness_ack(self, brightness_level: int, ack_status: bool) -> None:
+        """Update the light attributes from the ACK of a brightness packet."""
         if ack_status:
-            self._attr_brightness = 0
-            self._attr_state = False
+            self._attr_state = brightness_level > 0
+            self._attr_brightness = brightness_level
         else:
             # set light to unkown
             self._attr_state = None
             self._attr_brightness = None
-        self.async_write_ha_state()
-        # self.schedule_update_ha_state()
 
 
-class TISRGBLight(LightEntity):
+class TISRGBLight(TISEntityMixin, LightEntity):
     """Representation of a TIS RGB light."""
 
     def __init__(
@@ -273,6 +267,7 @@ class TISRGBLight(LightEntity):
         self.api = tis_api
         self.gateway = gateway
         self.device_id = device_id
+        self.device_address = pack_device_id(device_id)
         self.r_channel = int(r_channel)
         self.g_channel = int(g_channel)
         self.b_channel = int(b_channel)
@@ -281,7 +276,6 @@ class TISRGBLight(LightEntity):
         self._attr_name = light_name
         self._attr_state = None
         self._attr_rgb_color = None
-        self.listener = None
         self._attr_unique_id = (
             f"{self.name}_{self.r_channel}_{self.g_channel}_{self.b_channel}"
         )
@@ -292,77 +286,69 @@ class TISRGBLight(LightEntity):
         """."""
         self._attr_supported_color_modes = {ColorMode.RGB}
         self._attr_color_mode = ColorMode.RGB
-        self.generate_rgb_packets = handler.generate_rgb_light_control_packet
-        self.update_packet = handler.generate_control_update_packet(self)
+        self.update_packet = device_update_packet(self)
 
     async def async_added_to_hass(self) -> None:
         """Run when entity about to be added to hass."""
 
         @callback
-        async def handle_event(event: Event):
+        def handle_event(event: Event) -> None:
             """Handle the event."""
-            # check if event is for this switch
-            if event.event_type == str(self.device_id):
-                if event.data["feedback_type"] == "control_response":
-                    channel_value = event.data["additional_bytes"][2]
-                    channel_number = event.data["channel_number"]
-                    if int(channel_number) == self.r_channel:
-                        self._attr_rgb_color = (
-                            int((channel_value / 100) * 255),
-                            self._attr_rgb_color[1],
-                            self._attr_rgb_color[2],
-                        )
-                        self.rgb_values_flag[0] = 1
-                    elif int(channel_number) == self.g_channel:
-                        self._attr_rgb_color = (
-                            self._attr_rgb_color[0],
-                            int((channel_value / 100) * 255),
-                            self._attr_rgb_color[2],
-                        )
-                        self.rgb_values_flag[1] = 1
-                    elif int(channel_number) == self.b_channel:
-                        self._attr_rgb_color = (
-                            self._attr_rgb_color[0],
-                            self._attr_rgb_color[1],
-                            int((channel_value / 100) * 255),
-                        )
-                        self.rgb_values_flag[2] = 1
-                    if self.rgb_values_flag == [1, 1, 1]:
-                        self.rgb_values_flag = [0, 0, 0]
-                        self.async_write_ha_state()
-                elif event.data["feedback_type"] == "update_response":
-                    additional_bytes = event.data["additional_bytes"]
-                    channel_number = event.data["channel_number"]
-
-                    if self._attr_rgb_color is None:
-                        self._attr_rgb_color = [0, 0, 0]
-                    if channel_number == self.r_channel:
-                        self._attr_rgb_color[0] = int(
-                            (additional_bytes[channel_number] / 100) * 255
-                        )
-                    elif channel_number == self.g_channel:
-                        self._attr_rgb_color[1] = int(
-                            (additional_bytes[channel_number] / 100) * 255
-                        )
-                    elif channel_number == self.b_channel:
-                        self._attr_rgb_color[2] = int(
-                            (additional_bytes[channel_number] / 100) * 255
-                        )
-                    self._attr_state = bool(
-                        self.r_channel or self.g_channel or self.b_channel
+            if event.data["feedback_type"] == "control_response":
+                channel_value = event.data["additional_bytes"][2]
+                channel_number = event.data["channel_number"]
+                if int(channel_number) == self.r_channel:
+                    self._attr_rgb_color = (
+                        int((channel_value / 100) * 255),
+                        self._attr_rgb_color[1],
+                        self._attr_rgb_color[2],
+                    )
+                    self.rgb_values_flag[0] = 1
+                elif int(channel_number) == self.g_channel:
+                    self._attr_rgb_color = (
+                        self._attr_rgb_color[0],
+                        int((channel_value / 100) * 255),
+                        self._attr_rgb_color[2],
                     )
-                elif event.data["feedback_type"] == "offline_device":
-                    self._attr_state = STATE_UNKNOWN
+                    self.rgb_values_flag[1] = 1
+                elif int(channel_number) == self.b_channel:
+                    self._attr_rgb_color = (
+                        self._attr_rgb_color[0],
+                        self._attr_rgb_color[1],
+                        int((channel_value / 100) * 255),
+                    )
+                    self.rgb_values_flag[2] = 1
+                if self.rgb_values_flag == [1, 1, 1]:
+                    self.rgb_values_flag = [0, 0, 0]
+                    self.async_write_state_if_changed()
+            elif event.data["feedback_type"] == "update_response":
+                device_state = self.device_state
+                self._attr_rgb_color = tuple(
+                    int((device_state.value(channel) / 100) * 255)
+                    for channel in (self.r_channel, self.g_channel, self.b_channel)
+                )
+                self._attr_state = any(self._attr_rgb_color)
+
+        dispatcher = self.runtime_data.dispatcher
+        self.async_on_remove(
+            dispatcher.async_subscribe(
+                self.device_address,
+                RGB_FEEDBACK_TYPES,
+                handle_event,
+            )
+        )
 
-        self.listener = self.hass.bus.async_listen(str(self.device_id), handle_event)
-        # send update 5 times or untill recieveing a state
-        for _i in range(5):
+        @callback
+        def handle_initial_update(update: asyncio.Future[bool]) -> None:
+            """Fall back to an unknown state if the device never answered."""
             if self._attr_rgb_color is None:
-                _ = await self.api.protocol.sender.send_packet(self.update_packet)
+                self._attr_state = STATE_UNKNOWN
+                self._attr_rgb_color = (0, 0, 0)
 
-        if self._attr_rgb_color is None:
-            self._attr_state = STATE_UNKNOWN
-            self._attr_rgb_color = (0, 0, 0)
+        # the state sync paces and retries the request until the device answers
+        self.runtime_data.state_sync.async_request_update(
+            self.gateway, self.device_address, self.update_packet
+        ).add_done_callback(handle_initial_update)
 
     @property
     def color_mode(self) -> ColorMode | str | None:
@@ -390,6 +376,10 @@ class TISRGBLight(LightEntity):
         """Return the name of the light."""
         return self._attr_name
 
+    def state_snapshot(self) -> tuple:
+        """Return the attributes feedback can change."""
+        return (self._attr_state, self._attr_rgb_color)
+
     async def async_turn_on(self, **kwargs: Any) -> None:
         """Turn the light on."""
         # print all kwargs
@@ -398,29 +388,24 @@ class TISRGBLight(LightEntity):
             color = kwargs[ATTR_RGB_COLOR]
             # map color from 255 to 100
             color = tuple([int((c / 255) * 100) for c in color])
-            r_packet, g_packet, b_packet = self.generate_rgb_packets(self, color)
+            r_packet, g_packet, b_packet = (
+                handler.generate_rgb_light_control_packet(self, color)
+            )
             logging.warning("color (percent): %s", color)
-            ack_status = await self.api.protocol.sender.send_packet_with_ack(r_packet)
-            if not ack_status:
-                logging.error(
-                    "error turning on light: %s, channel: %s",
-                    ack_status,
-                    self.r_channel,
-                )
-            ack_status = await self.api.protocol.sender.send_packet_with_ack(g_packet)
-            if not ack_status:
-                logging.error(
-                    "error turning on light: %s, channel: %s",
-                    ack_status,
-                    self.g_channel,
-                )
-            ack_status = await self.api.protocol.sender.send_packet_with_ack(b_packet)
-            if not ack_status:
-                logging.error(
-                    "error turning on light: %s, channel: %s",
-                    ack_status,
-                    self.b_channel,
-                )
+            ack_statuses = await send_packets_with_ack(
+                self.runtime_data.ack_tracker, (r_packet, g_packet, b_packet)
+            )
+            for channel, ack_status in zip(
+                (self.r_channel, self.g_channel, self.b_channel),
+                ack_statuses,
+                strict=True,
+            ):
+                if not ack_status:
+                    logging.error(
+                        "error turning on light: %s, channel: %s",
+                        ack_status,
+                        channel,
+                    )
 
             self._attr_state = True
             # map color from 100 to 255
@@ -434,16 +419,18 @@ class TISRGBLight(LightEntity):
 
     async def async_turn_off(self, **kwargs: Any) -> None:
         """Turn the light off."""
-        r_packet, g_packet, b_packet = self.generate_rgb_packets(self, (0, 0, 0))
-        _ = await self.api.protocol.sender.send_packet_with_ack(g_packet)
-        _ = await self.api.protocol.sender.send_packet_with_ack(r_packet)
-        _ = await self.api.protocol.sender.send_packet_with_ack(b_packet)
+        r_packet, g_packet, b_packet = handler.generate_rgb_light_control_packet(
+            self, (0, 0, 0)
+        )
+        _ = await send_packets_with_ack(
+            self.runtime_data.ack_tracker, (r_packet, g_packet, b_packet)
+        )
         self._attr_state = False
         self._attr_rgb_color = (0, 0, 0)
         self.async_write_ha_state()
 
 
-class TISRGBWLight(LightEntity):
+class TISRGBWLight(TISEntityMixin, LightEntity):
     """Representation of a TIS RGBW light."""
 
     def __init__(
@@ -461,6 +448,7 @@ class TISRGBWLight(LightEntity):
         self.api = tis_api
         self.gateway = gateway
         self.device_id = device_id
+        self.device_address = pack_device_id(device_id)
         self.r_channel = int(r_channel)
         self.g_channel = int(g_channel)
         self.b_channel = int(b_channel)
@@ -471,7 +459,6 @@ class TISRGBWLight(LightEntity):
         self._attr_brightness = None
         self._attr_rgbw_color = None
         self.rgbw_value_flags = [0, 0, 0, 0]
-        self.listener = None
         self._attr_unique_id = f"{self.name}_{self.r_channel}_{self.g_channel}_{self.b_channel}_{self.w_channel}"
         self.setup_light()
 
@@ -480,80 +467,86 @@ class TISRGBWLight(LightEntity):
         self._attr_supported_color_modes = {ColorMode.RGBW}
         self._attr_color_mode = ColorMode.RGBW
         self._attr_supported_features = LightEntityFeature.TRANSITION
-        self.generate_rgbw_packets = handler.generate_rgbw_light_control_packet
-        self.update_packet = handler.generate_control_update_packet(self)
+        self.update_packet = device_update_packet(self)
 
     async def async_added_to_hass(self) -> None:
         """Run when entity about to be added to hass."""
 
         @callback
-        async def handle_event(event: Event):
+        def handle_event(event: Event) -> None:
             """Handle the event."""
-            # check if event is for this switch
-            if event.event_type == str(self.device_id):
-                if event.data["feedback_type"] == "control_response":
-                    channel_value = event.data["additional_bytes"][2]
-                    channel_number = event.data["channel_number"]
-                    if int(channel_number) == self.r_channel:
-                        self._attr_rgbw_color = (
-                            int((channel_value / 100) * 255),
-                            self._attr_rgbw_color[1],
-                            self._attr_rgbw_color[2],
-                            self._attr_rgbw_color[3],
-                        )
-                        self.rgbw_value_flags[0] = 1
-                    elif int(channel_number) == self.g_channel:
-                        self._attr_rgbw_color = (
-                            self._attr_rgbw_color[0],
-                            int((channel_value / 100) * 255),
-                            self._attr_rgbw_color[2],
-                            self._attr_rgbw_color[3],
-                        )
-                        self.rgbw_value_flags[1] = 1
-                    elif int(channel_number) == self.b_channel:
-                        self._attr_rgbw_color = (
-                            self._attr_rgbw_color[0],
-                            self._attr_rgbw_color[1],
-                            int((channel_value / 100) * 255),
-                            self._attr_rgbw_color[3],
-                        )
-                        self.rgbw_value_flags[2] = 1
-                    elif int(channel_number) == self.w_channel:
-                        self._attr_rgbw_color = (
-                            self._attr_rgbw_color[0],
-                            self._attr_rgbw_color[1],
-                            self._attr_rgbw_color[2],
-                            int((channel_value / 100) * 255),
-                        )
-                        self.rgbw_value_flags[3] = 1
-                    if self.rgbw_value_flags == [1, 1, 1, 1]:
-                        self.async_write_ha_state()
-
-                elif event.data["feedback_type"] == "update_response":
-                    additional_bytes = event.data["additional_bytes"]
-
-                    r_value = (additional_bytes[self.r_channel] / 100) * 255
-
-                    g_value = (additional_bytes[self.g_channel] / 100) * 255
-
-                    b_value = (additional_bytes[self.b_channel] / 100) * 255
-
-                    w_value = (additional_bytes[self.w_channel] / 100) * 255
-
-                    self._attr_rgbw_color = (r_value, g_value, b_value, w_value)
-                    self._attr_state = bool(r_value or g_value or b_value or w_value)
-                elif event.data["feedback_type"] == "offline_device":
-                    self._attr_state = STATE_UNKNOWN
-
-        self.listener = self.hass.bus.async_listen(str(self.device_id), handle_event)
-        # send update 5 times or untill recieveing a state
-        for _i in range(5):
+            if event.data["feedback_type"] == "control_response":
+                channel_value = event.data["additional_bytes"][2]
+                channel_number = event.data["channel_number"]
+                if int(channel_number) == self.r_channel:
+                    self._attr_rgbw_color = (
+                        int((channel_value / 100) * 255),
+                        self._attr_rgbw_color[1],
+                        self._attr_rgbw_color[2],
+                        self._attr_rgbw_color[3],
+                    )
+                    self.rgbw_value_flags[0] = 1
+                elif int(channel_number) == self.g_channel:
+                    self._attr_rgbw_color = (
+                        self._attr_rgbw_color[0],
+                        int((channel_value / 100) * 255),
+                        self._attr_rgbw_color[2],
+                        self._attr_rgbw_color[3],
+                    )
+                    self.rgbw_value_flags[1] = 1
+                elif int(channel_number) == self.b_channel:
+                    self._attr_rgbw_color = (
+                        self._attr_rgbw_color[0],
+                        self._attr_rgbw_color[1],
+                        int((channel_value / 100) * 255),
+                        self._attr_rgbw_color[3],
+                    )
+                    self.rgbw_value_flags[2] = 1
+                elif int(channel_number) == self.w_channel:
+                    self._attr_rgbw_color = (
+                        self._attr_rgbw_color[0],
+                        self._attr_rgbw_color[1],
+                        self._attr_rgbw_color[2],
+                        int((channel_value / 100) * 255),
+                    )
+                    self.rgbw_value_flags[3] = 1
+                if self.rgbw_value_flags == [1, 1, 1, 1]:
+                    self.async_write_state_if_changed()
+
+            elif event.data["feedback_type"] == "update_response":
+                device_state = self.device_state
+
+                r_value = (device_state.value(self.r_channel) / 100) * 255
+
+                g_value = (device_state.value(self.g_channel) / 100) * 255
+
+                b_value = (device_state.value(self.b_channel) / 100) * 255
+
+                w_value = (device_state.value(self.w_channel) / 100) * 255
+
+                self._attr_rgbw_color = (r_value, g_value, b_value, w_value)
+                self._attr_state = bool(r_value or g_value or b_value or w_value)
+
+        dispatcher = self.runtime_data.dispatcher
+        self.async_on_remove(
+            dispatcher.async_subscribe(
+                self.device_address,
+                RGB_FEEDBACK_TYPES,
+                handle_event,
+            )
+        )
+
+        @callback
+        def handle_initial_update(update: asyncio.Future[bool]) -> None:
+            """Fall back to an unknown state if the device never answered."""
             if self._attr_rgbw_color is None:
-                _ = await self.api.protocol.sender.send_packet(self.update_packet)
+                self._attr_state = STATE_UNKNOWN
+                self._attr_rgbw_color = (0, 0, 0, 0)
 
-        if self._attr_rgbw_color is None:
-            self._attr_state = STATE_UNKNOWN
-            self._attr_rgbw_color = (0, 0, 0, 0)
+        # the state sync paces and retries the request until the device answers
+        self.runtime_data.state_sync.async_request_update(
+            self.gateway, self.device_address, self.update_packet
+        ).add_done_callback(handle_initial_update)
 
     @property
     def brightness(self) -> int | None:
@@ -591,6 +584,10 @@ class TISRGBWLight(LightEntity):
         """Return the name of the light."""
         return self._attr_name
 
+    def state_snapshot(self) -> tuple:
+        """Return the attributes feedback can change."""
+        return (self._attr_state, self._attr_rgbw_color)
+
     async def async_turn_on(self, **kwargs: Any) -> None:
         """Turn the light on."""
         # print all kwargs
@@ -600,38 +597,25 @@ class TISRGBWLight(LightEntity):
             color = kwargs[ATTR_RGBW_COLOR]
             # map color from 255 to 100
             color = tuple([int((c / 255) * 100) for c in color])
-            r_packet, g_packet, b_packet, w_packet = self.generate_rgbw_packets(
-                self, color
+            r_packet, g_packet, b_packet, w_packet = (
+                handler.generate_rgbw_light_control_packet(self, color)
             )
             logging.warning("color (percent): %s", color)
-            ack_status = await self.api.protocol.sender.send_packet_with_ack(r_packet)
-            if not ack_status:
-                logging.error(
-                    "error turning on light: %s, channel: %s",
-                    ack_status,
-                    self.r_channel,
-                )
-            ack_status = await self.api.protocol.sender.send_packet_with_ack(g_packet)
-            if not ack_status:
-                logging.error(
-                    "error turning on light: %s, channel: %s",
-                    ack_status,
-                    self.g_channel,
-                )
-            ack_status = await self.api.protocol.sender.send_packet_with_ack(b_packet)
-            if not ack_status:
-                logging.error(
-                    "error turning on light: %s, channel: %s",
-                    ack_status,
-                    self.b_channel,
-                )
-            ack_status = await self.api.protocol.sender.send_packet_with_ack(w_packet)
-            if not ack_status:
-                logging.error(
-                    "error turning on light: %s, channel: %s",
-                    ack_status,
-                    self.w_channel,
-                )
+            ack_statuses = await send_packets_with_ack(
+                self.runtime_data.ack_tracker,
+                (r_packet, g_packet, b_packet, w_packet),
+            )
+            for channel, ack_status in zip(
+                (self.r_channel, self.g_channel, self.b_channel, self.w_channel),
+                ack_statuses,
+                strict=True,
+            ):
+                if not ack_status:
+                    logging.error(
+                        "error turning on light: %s, channel: %s",
+                        ack_status,
+                        channel,
+                    )
 
             self._attr_state = True
             # map color from 100 to 255
@@ -645,13 +629,13 @@ class TISRGBWLight(LightEntity):
 
     async def async_turn_off(self, **kwargs: Any) -> None:
         """Turn the light off."""
-        r_packet, g_packet, b_packet, w_packet = self.generate_rgbw_packets(
-            self, (0, 0, 0, 0)
+        r_packet, g_packet, b_packet, w_packet = (
+            handler.generate_rgbw_light_control_packet(self, (0, 0, 0, 0))
+        )
+        _ = await send_packets_with_ack(
+            self.runtime_data.ack_tracker,
+            (r_packet, g_packet, b_packet, w_packet),
         )
-        _ = await self.api.protocol.sender.send_packet_with_ack(r_packet)
-        _ = await self.api.protocol.sender.send_packet_with_ack(g_packet)
-        _ = await self.api.protocol.sender.send_packet_with_ack(b_packet)
-        _ = await self.api.protocol.sender.send_packet_with_ack(w_packet)
         self._attr_state = False
         self._attr_rgbw_color = (0, 0, 0, 0)
         self.async_write_ha_state()
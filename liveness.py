@@ -0,0 +1,193 @@
+"""Liveness tracking of TIS devices."""
+
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+from enum import StrEnum
+import logging
+from typing import Any
+
+from TISControlProtocol.api import TISApi
+from TISControlProtocol.Protocols.udp.ProtocolHandler import TISPacket
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.entity_platform import async_get_platforms
+
+from .const import DOMAIN, LIVENESS_OFFLINE_FAILURES, LIVENESS_PROBE_INTERVAL
+from .dispatcher import pack_device_id
+from .gateways import SendPriority, TISGatewaySender
+from .packets import PacketTarget, device_update_packet
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class DeviceLiveness(StrEnum):
+    """Liveness of a TIS device."""
+
+    ONLINE = "online"
+    DEGRADED = "degraded"
+    OFFLINE = "offline"
+
+
+@dataclass(slots=True)
+class DeviceHealth:
+    """Liveness bookkeeping of one device."""
+
+    status: DeviceLiveness = DeviceLiveness.ONLINE
+    failures: int = 0
+    probe_packet: TISPacket | None = None
+    probe_timer: asyncio.TimerHandle | None = None
+
+
+class TISLiveness:
+    """Track which devices answer, and share it with all their entities.
+
+    Every received packet marks its device online. Every command that is
+    still unanswered after its retries counts as a failure: the first one
+    makes the device degraded, LIVENESS_OFFLINE_FAILURES in a row make it
+    offline. Offline devices get no control traffic; instead their status is
+    probed every LIVENESS_PROBE_INTERVAL seconds until a packet arrives.
+    Entities register the update packet their device answers as its probe;
+    devices without one are probed with the control update packet, which
+    relays and dimmers answer.
+
+    Entities of an offline device are unavailable. Status changes are
+    collected and written to the affected entities in one pass per loop
+    iteration.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        api: TISApi,
+        gateways: TISGatewaySender,
+        entry_id: str,
+    ) -> None:
+        """Initialize the tracker."""
+        self.hass = hass
+        self.api = api
+        self.gateways = gateways
+        self.entry_id = entry_id
+        self._devices: dict[int, DeviceHealth] = {}
+        self._probes: dict[int, list[TISPacket]] = {}
+        self._changed: set[int] = set()
+
+    @callback
+    def async_seen(self, device_address: int) -> bool:
+        """Mark a device online, return True if it was offline."""
+        health = self._devices.get(device_address)
+        if health is None or (
+            health.status is DeviceLiveness.ONLINE and not health.failures
+        ):
+            return False
+        was_offline = health.status is DeviceLiveness.OFFLINE
+        health.failures = 0
+        if was_offline:
+            _LOGGER.info("TIS device %#06x is back online", device_address)
+            self._async_cancel_probe(health)
+            self._async_changed(device_address)
+        health.status = DeviceLiveness.ONLINE
+        return was_offline
+
+    @callback
+    def async_failed(self, packet: TISPacket) -> None:
+        """Count a packet its device did not answer."""
+        device_address = pack_device_id(packet.device_id)
+        if (health := self._devices.get(device_address)) is None:
+            health = self._devices[device_address] = DeviceHealth()
+        if health.probe_packet is None:
+            health.probe_packet = device_update_packet(
+                PacketTarget(packet.device_id, self.api, packet.destination_ip)
+            )
+        health.failures += 1
+        if health.status is DeviceLiveness.OFFLINE:
+            return
+        if health.failures < LIVENESS_OFFLINE_FAILURES:
+            health.status = DeviceLiveness.DEGRADED
+            return
+        _LOGGER.warning("TIS device %#06x is offline", device_address)
+        health.status = DeviceLiveness.OFFLINE
+        self._async_changed(device_address)
+        self._async_schedule_probe(device_address, health)
+
+    @callback
+    def async_add_probe(self, device_address: int, packet: TISPacket) -> CALLBACK_TYPE:
+        """Probe a device with packet while it is offline, return the remover."""
+        probes = self._probes.setdefault(device_address, [])
+        probes.append(packet)
+
+        @callback
+        def async_remove_probe() -> None:
+            """Stop using the packet as probe."""
+            probes.remove(packet)
+            if not probes and self._probes.get(device_address) is probes:
+                del self._probes[device_address]
+
+        return async_remove_probe
+
+    def is_available(self, device_address: int) -> bool:
+        """Return False if a device is known to be offline."""
+        health = self._devices.get(device_address)
+        return health is None or health.status is not DeviceLiveness.OFFLINE
+
+    @callback
+    def _async_schedule_probe(self, device_address: int, health: DeviceHealth) -> None:
+        """Probe an offline device after LIVENESS_PROBE_INTERVAL."""
+        health.probe_timer = self.hass.loop.call_later(
+            LIVENESS_PROBE_INTERVAL, self._async_probe, device_address
+        )
+
+    @callback
+    def _async_probe(self, device_address: int) -> None:
+        """Ask an offline device for its status, and schedule the next probe."""
+        health = self._devices[device_address]
+        if probes := self._probes.get(device_address):
+            self.gateways.async_send(probes[0], SendPriority.POLL)
+        else:
+            self.gateways.async_send(health.probe_packet, SendPriority.POLL)
+        self._async_schedule_probe(device_address, health)
+
+    @callback
+    def _async_cancel_probe(self, health: DeviceHealth) -> None:
+        """Stop probing a device."""
+        if health.probe_timer is not None:
+            health.probe_timer.cancel()
+            health.probe_timer = None
+
+    @callback
+    def _async_changed(self, device_address: int) -> None:
+        """Queue an availability update for the entities of a device."""
+        if not self._changed:
+            self.hass.loop.call_soon(self._async_write_availability)
+        self._changed.add(device_address)
+
+    @callback
+    def _async_write_availability(self) -> None:
+        """Write the state of every entity whose device changed availability."""
+        changed, self._changed = self._changed, set()
+        for platform in async_get_platforms(self.hass, DOMAIN):
+            if platform.config_entry is None or (
+                platform.config_entry.entry_id != self.entry_id
+            ):
+                continue
+            for entity in list(platform.entities.values()):
+                if getattr(entity, "device_address", None) in changed:
+                    entity.async_write_ha_state()
+
+    @callback
+    def async_stop(self) -> None:
+        """Cancel the probes."""
+        for health in self._devices.values():
+            self._async_cancel_probe(health)
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        """Return the status of every device that missed a packet."""
+        return {
+            f"{device_address:#06x}": {
+                "status": health.status.value,
+                "failures": health.failures,
+            }
+            for device_address, health in self._devices.items()
+        }
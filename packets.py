@@ -0,0 +1,46 @@
+"""Packet templates shared by the entities of one TIS device."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any
+
+from TISControlProtocol.api import TISApi
+from TISControlProtocol.Protocols.udp.ProtocolHandler import (
+    TISPacket,
+    TISProtocolHandler,
+)
+
+handler = TISProtocolHandler()
+
+
+@dataclass(slots=True)
+class PacketTarget:
+    """The attributes the protocol handler reads from an entity."""
+
+    device_id: list[int]
+    api: TISApi
+    gateway: str
+
+
+# API -> (gateway, device_id) -> control update packet of the device
+_update_packets: dict[TISApi, dict[tuple[str, tuple[int, ...]], TISPacket]] = {}
+
+
+def device_update_packet(entity: Any) -> TISPacket:
+    """Return the control update packet of the entity's device.
+
+    The packet asks for the status of every channel of the device, so all
+    channel entities of a device share one instance instead of building
+    their own. Packets are cached per API until its config entry unloads.
+    """
+    packets = _update_packets.setdefault(entity.api, {})
+    key = (entity.gateway, tuple(entity.device_id))
+    if (packet := packets.get(key)) is None:
+        packet = packets[key] = handler.generate_control_update_packet(entity)
+    return packet
+
+
+def clear_update_packets(api: TISApi) -> None:
+    """Drop the cached update packets of an API."""
+    _update_packets.pop(api, None)
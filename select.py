@@ -1,7 +1,8 @@
 from homeassistant.components.select import SelectEntity, ATTR_OPTIONS
 from TISControlProtocol.mock_api import TISApi
 from .const import DOMAIN
-from homeassistant.const import MATCH_ALL
+from .dispatcher import pack_device_id
+from .entities import TISEntityMixin
 from homeassistant.core import callback, Event, HomeAssistant
 from TISControlProtocol.Protocols.udp.ProtocolHandler import (
     TISPacket,
@@ -55,7 +56,7 @@ async def async_setup_entry(hass: HomeAssistant, entry, async_add_devices):
     )
 
 
-class TISSecurity(SelectEntity):
+class TISSecurity(TISEntityMixin, SelectEntity):
     def __init__(self, api, name, options, initial_option, channel_number, device_id, gateway):
         self._name = name
         self.api = api
@@ -64,29 +65,42 @@ class TISSecurity(SelectEntity):
         self._attr_icon = "mdi:shield"
         self._attr_is_protected = True
         self._attr_read_only = True
-        self._listner = None
         self.channel_number=int(channel_number)
         self.device_id = device_id
+        self.device_address = pack_device_id(device_id)
         self.gateway = gateway
 
     async def async_added_to_hass(self) -> None:
         @callback
-        async def handle_event(event: Event):
+        def handle_admin_lock(event: Event):
             """Handle a admin lock status change event."""
             self.protect() if event.data.get("locked") else self.unprotect()
+            self.async_write_ha_state()
 
-            if event.data.get("feedback_type") == "security_feedback":
-                if self.channel_number == event.data["channel_number"]:
-                    mode = event.data["mode"]
-                    if mode in SECURITY_FEEDBACK_OPTIONS:
-                        option = SECURITY_FEEDBACK_OPTIONS[mode]
-                        self._state = self._attr_current_option = option
+        @callback
+        def handle_event(event: Event):
+            """Handle a security feedback event."""
+            mode = event.data["mode"]
+            if mode in SECURITY_FEEDBACK_OPTIONS:
+                option = SECURITY_FEEDBACK_OPTIONS[mode]
+                self._state = self._attr_current_option = option
 
             self.async_write_ha_state()
 
             # self.update_security_status()
 
-        self._listener = self.hass.bus.async_listen(MATCH_ALL, handle_event)
+        dispatcher = self.runtime_data.dispatcher
+        self.async_on_remove(
+            self.hass.bus.async_listen("admin_lock", handle_admin_lock)
+        )
+        self.async_on_remove(
+            dispatcher.async_subscribe(
+                self.device_address,
+                ("security_feedback",),
+                handle_event,
+                channel_number=self.channel_number,
+            )
+        )
 
 
     @property
@@ -121,7 +135,7 @@ class TISSecurity(SelectEntity):
         if mode:
             control_packet = handler.generate_control_security_packet(self,mode)
             logging.error(f"Security packet: {control_packet}")
-            ack = await self.api.protocol.sender.send_packet_with_ack(control_packet)
+            ack = await self.runtime_data.ack_tracker.send_packet_with_ack(control_packet)
             
             if ack:
                 # set state        
@@ -1,134 +1,66 @@
 """Sensor platform for TIS Control."""
 
 from datetime import timedelta
+from functools import partial
 import logging
 
 from gpiozero import CPUTemperature  # type: ignore
 from TISControlProtocol.api import TISApi
-from TISControlProtocol.Protocols.udp.ProtocolHandler import TISProtocolHandler
 
 from homeassistant.components.sensor import SensorEntity, UnitOfTemperature
 from homeassistant.core import Event, HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
 from homeassistant.helpers.event import async_track_time_interval
-from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
 
 from . import TISConfigEntry
-from .coordinator import SensorUpdateCoordinator
+from .appliances import Appliance
 from .entities import BaseSensorEntity
 
 
-# TODO: remove this
-class TempEntity:
-    def __init__(self, device_id, api, gateway):
-        self.device_id = device_id
-        self.api = api
-        self.gateway = gateway
-
-
 async def async_setup_entry(
     hass: HomeAssistant, entry: TISConfigEntry, async_add_devices: AddEntitiesCallback
 ) -> None:
     """Set up the TIS sensors."""
-    # Create an instance of your sensor
-    tis_api: TISApi = entry.runtime_data.api
-    # sensor = TemperatureSensor(hass, tis_api, [0x01, 0x08], "luna", "192.168.1.200")
-    tis_sensors = []
+    appliances = entry.runtime_data.appliances
     for sensor_type, sensor_handler in RELEVANT_TYPES.items():
-        sensors: list[dict] = await tis_api.get_entities(platform=sensor_type)
-        if sensors and len(sensors) > 0:
-            # exctract the data
-            sensor_entities = [
-                (
-                    appliance_name,
-                    next(iter(appliance["channels"][0].values())),
-                    appliance["device_id"],
-                    appliance["is_protected"],
-                    appliance["gateway"],
-                )
-                for sensor in sensors
-                for appliance_name, appliance in sensor.items()
-            ]
-            # create the sensor objects
-            sensor_objects = [
-                sensor_handler(
-                    get_coordinator(
-                        hass=hass,
-                        tis_api=tis_api,
-                        device_id=device_id,
-                        gateway=gateway,
-                    ),
-                    name=appliance_name,
-                    device_id=device_id,
-                )
-                for appliance_name, channel_number, device_id, is_protected, gateway in sensor_entities
-            ]
-            # add the sensor objects to the list
-            tis_sensors.extend(sensor_objects)
-
-    cpu_temp_sensor = CPUTemperatureSensor(hass)
-    tis_sensors.append(cpu_temp_sensor)
-    # Add the sensor to Home Assistant
-    async_add_devices(tis_sensors)
-
-
-def get_coordinator(
-    hass: HomeAssistant, tis_api: TISApi, device_id: list[int], gateway: str
-) -> SensorUpdateCoordinator:
-    """Get or create a SensorUpdateCoordinator for the given device_id.
-
-    :param hass: Home Assistant instance.
-    :type hass: HomeAssistant
-    :param tis_api: The TIS API instance.
-    :type tis_api: TISApi
-    :param protocol_handler: The protocol handler instance.
-    :type protocol_handler: ProtocolHandler
-    :param device_id: The device ID as a list of integers.
-    :type device_id: List[int]
-    :return: The SensorUpdateCoordinator for the given device_id.
-    :rtype: SensorUpdateCoordinator
-    """
-    device_id_tuple = tuple(device_id)  # Convert list to tuple for dictionary key
-
-    if device_id_tuple not in coordinators:
-        logging.error("creating new coordinator")
-        _entity = TempEntity(device_id, tis_api, gateway)
-        update_packet = protocol_handler.generate_health_sensor_update_packet(
-            entity=_entity
-        )
-        # TODO: fix this
-        coordinators[device_id_tuple] = SensorUpdateCoordinator(
-            hass,
-            tis_api,
-            timedelta(seconds=5),
-            device_id,
-            update_packet,
+        # the sensors are polled by the entry's health coordinator
+        appliances.async_setup_type(
+            sensor_type, partial(build_sensor, sensor_handler), async_add_devices
         )
-    return coordinators[device_id_tuple]
+    async_add_devices([CPUTemperatureSensor(hass)])
+
+
+def build_sensor(
+    sensor_handler: type[BaseSensorEntity], tis_api: TISApi, sensor: Appliance
+) -> BaseSensorEntity:
+    """Create the entity of a sensor appliance."""
+    return sensor_handler(
+        name=sensor.name,
+        device_id=sensor.device_id,
+        gateway=sensor.gateway,
+    )
 
 
-protocol_handler = TISProtocolHandler()
 _LOGGER = logging.getLogger(__name__)
-coordinators = {}
 
 
 class CoordinatedTemperatureSensor(BaseSensorEntity, SensorEntity):
     """Representation of a coordinated TIS sensor.
 
-    :param coordinator: The coordinator object. :type coordinator: SensorUpdateCoordinator
     :param name: The name of the sensor. :type name: str
     :param device_id: The device id of the sensor. :type device_id: str
+    :param gateway: The gateway of the sensor. :type gateway: str
     """
 
     def __init__(
         self,
-        coordinator: DataUpdateCoordinator,
         name: str,
         device_id: list,
+        gateway: str,
     ) -> None:
         """Initialize the sensor."""
-        super().__init__(coordinator, name, device_id)
+        super().__init__(name, device_id, gateway)
         self._attr_icon = "mdi:thermometer"
         self.name = name
         self.device_id = device_id
@@ -144,15 +76,18 @@ class CoordinatedTemperatureSensor(BaseSensorEntity, SensorEntity):
                 if event.data["feedback_type"] == "health_feedback":
                     # logging.error(f"event data for temperature log: {event.data}")
                     self._state = event.data["temp"]
-                self.async_write_ha_state()
+                self.async_write_state_if_changed()
             except Exception as e:
                 logging.error("event data error for temperature: %s", event.data)
 
-        self.hass.bus.async_listen(str(self.device_id), handle_temperature_feedback)
-
-    def _update_state(self, data):
-        """Update the state based on the data."""
-        # TODO: Implement the update logic
+        dispatcher = self.runtime_data.dispatcher
+        self.async_on_remove(
+            dispatcher.async_subscribe(
+                self.device_address,
+                ("health_feedback",),
+                handle_temperature_feedback,
+            )
+        )
 
     @property
     def unit_of_measurement(self) -> UnitOfTemperature:
@@ -164,19 +99,19 @@ class CoordinatedTemperatureSensor(BaseSensorEntity, SensorEntity):
 class CoordinatedLUXSensor(BaseSensorEntity, SensorEntity):
     """Representation of a coordinated TIS sensor.
 
-    :param coordinator: The coordinator object. :type coordinator: SensorUpdateCoordinator
     :param name: The name of the sensor. :type name: str
     :param device_id: The device id of the sensor. :type device_id: str
+    :param gateway: The gateway of the sensor. :type gateway: str
     """
 
     def __init__(
         self,
-        coordinator: DataUpdateCoordinator,
         name: str,
         device_id: list,
+        gateway: str,
     ) -> None:
         """Initialize the sensor."""
-        super().__init__(coordinator, name, device_id)
+        super().__init__(name, device_id, gateway)
         self._attr_icon = "mdi:brightness-6"
         self.name = name
         self.device_id = device_id
@@ -192,14 +127,18 @@ class CoordinatedLUXSensor(BaseSensorEntity, SensorEntity):
                 if event.data["feedback_type"] == "health_feedback":
                     logging.error(f"lux event data log: {event.data}")
                     self._state = int(event.data["lux"])
-                self.async_write_ha_state()
+                self.async_write_state_if_changed()
             except Exception as e:
                 logging.error("event data error for lux: %s", event.data)
 
-        self.hass.bus.async_listen(str(self.device_id), handle_health_feedback)
-
-    def _update_state(self, data):
-        """Update the state based on the data."""
+        dispatcher = self.runtime_data.dispatcher
+        self.async_on_remove(
+            dispatcher.async_subscribe(
+                self.device_address,
+                ("health_feedback",),
+                handle_health_feedback,
+            )
+        )
 
 
 class CPUTemperatureSensor(SensorEntity):
@@ -0,0 +1,167 @@
+"""Shared, paced state update requests for TIS devices."""
+
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+from functools import partial
+import logging
+from typing import TYPE_CHECKING, Any
+
+from TISControlProtocol.api import TISApi
+from TISControlProtocol.Protocols.udp.ProtocolHandler import TISPacket
+
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+
+from .const import STATE_SYNC_RETRIES, UPDATE_RESPONSE_TIMEOUT
+from .dispatcher import TISDispatcher
+from .gateways import SendPriority, TISGatewaySender
+
+if TYPE_CHECKING:
+    from .liveness import TISLiveness
+
+_LOGGER = logging.getLogger(__name__)
+
+DeviceKey = tuple[str, int]
+
+
+@dataclass(slots=True)
+class UpdateRequest:
+    """A queued status request for one device."""
+
+    packet: TISPacket
+    future: asyncio.Future[bool]
+    unsubscribe: CALLBACK_TYPE
+    attempts: int = 0
+    timer: asyncio.TimerHandle | None = None
+
+
+class TISStateSync:
+    """Deduplicate and pace channel status requests per (gateway, device).
+
+    The first entity asking for a device's status queues its update packet;
+    every other entity of that device asking while the request is pending
+    shares the same future. Packets go through the paced queue of their
+    gateway, so a restart does not flood the bus and a slow gateway does not
+    hold back the others.
+    Devices that do not answer within UPDATE_RESPONSE_TIMEOUT are queued
+    again, up to STATE_SYNC_RETRIES times, before the future resolves False
+    and the device is reported to the liveness tracker.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        api: TISApi,
+        dispatcher: TISDispatcher,
+        gateways: TISGatewaySender,
+        liveness: TISLiveness,
+    ) -> None:
+        """Initialize the state sync."""
+        self.hass = hass
+        self.api = api
+        self.dispatcher = dispatcher
+        self.gateways = gateways
+        self.liveness = liveness
+        self._requests: dict[DeviceKey, UpdateRequest] = {}
+        self.requested = 0
+        self.answered = 0
+        self.unanswered = 0
+
+    @callback
+    def async_request_update(
+        self, gateway: str, device_address: int, packet: TISPacket
+    ) -> asyncio.Future[bool]:
+        """Request the channel status of a device, sharing pending requests."""
+        key = (gateway, device_address)
+        if (request := self._requests.get(key)) is not None:
+            return request.future
+
+        future: asyncio.Future[bool] = self.hass.loop.create_future()
+
+        @callback
+        def handle_update_response(event: Event) -> None:
+            self._async_resolve(key, True)
+
+        self._requests[key] = UpdateRequest(
+            packet,
+            future,
+            self.dispatcher.async_subscribe(
+                device_address, ("update_response",), handle_update_response
+            ),
+        )
+        self.requested += 1
+        self._async_enqueue(key)
+        return future
+
+    @callback
+    def _async_enqueue(self, key: DeviceKey) -> None:
+        """Queue the packet of a request on its gateway."""
+        self.gateways.async_send(
+            self._requests[key].packet,
+            SendPriority.STATE_SYNC,
+            partial(self._async_handle_send, key),
+        )
+
+    @callback
+    def _async_handle_send(self, key: DeviceKey) -> bool:
+        """Start the timeout of a request about to be sent, if still pending."""
+        if (request := self._requests.get(key)) is None:
+            return False
+        request.attempts += 1
+        if request.timer is not None:
+            request.timer.cancel()
+        request.timer = self.hass.loop.call_later(
+            UPDATE_RESPONSE_TIMEOUT, self._async_handle_timeout, key, request
+        )
+        return True
+
+    @callback
+    def _async_handle_timeout(self, key: DeviceKey, request: UpdateRequest) -> None:
+        """Retry a request that got no answer, or give up on it."""
+        if self._requests.get(key) is not request:
+            # answered meanwhile, and maybe requested again since
+            return
+        request.timer = None
+        if request.attempts <= STATE_SYNC_RETRIES:
+            self._async_enqueue(key)
+        else:
+            _LOGGER.debug("No update response from %s", key)
+            self.liveness.async_failed(request.packet)
+            self._async_resolve(key, False)
+
+    @callback
+    def _async_resolve(self, key: DeviceKey, answered: bool) -> None:
+        """Finish a request and report when the sync has converged."""
+        if (request := self._requests.pop(key, None)) is None:
+            return
+        request.unsubscribe()
+        if request.timer is not None:
+            request.timer.cancel()
+        request.future.set_result(answered)
+        if answered:
+            self.answered += 1
+        else:
+            self.unanswered += 1
+        if not self._requests:
+            _LOGGER.info(
+                "TIS state sync done: %s of %s devices answered",
+                self.answered,
+                self.requested,
+            )
+
+    @callback
+    def async_stop(self) -> None:
+        """Cancel the pending requests."""
+        for key in list(self._requests):
+            self._async_resolve(key, False)
+
+    @property
+    def progress(self) -> dict[str, Any]:
+        """Return the sync progress."""
+        return {
+            "requested": self.requested,
+            "answered": self.answered,
+            "unanswered": self.unanswered,
+            "pending": len(self._requests),
+        }
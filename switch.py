@@ -3,10 +3,8 @@
 from __future__ import annotations
 
 from collections.abc import Callable
-from math import ceil
 from typing import Any
 
-from TISControlProtocol.BytesHelper import int_to_8_bit_binary
 from TISControlProtocol.mock_api import TISApi
 from TISControlProtocol.Protocols.udp.ProtocolHandler import (
     TISPacket,
@@ -14,48 +12,38 @@ from TISControlProtocol.Protocols.udp.ProtocolHandler import (
 )
 
 from homeassistant.components.switch import SwitchEntity
-from homeassistant.const import MATCH_ALL, STATE_OFF, STATE_ON, STATE_UNKNOWN, Platform
+from homeassistant.const import STATE_OFF, STATE_ON, STATE_UNKNOWN, Platform
 from homeassistant.core import Event, HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 import logging
 
 
 from . import TISConfigEntry
+from .appliances import Appliance
+from .dispatcher import pack_device_id
+from .entities import TISEntityMixin
+from .packets import device_update_packet
 # hello
 async def async_setup_entry(
     hass: HomeAssistant, entry: TISConfigEntry, async_add_devices: AddEntitiesCallback
 ) -> None:
     """Set up the TIS switches."""
-    # tis_api: TISApi = hass.data[DOMAIN]["tis_api"]
-    tis_api: TISApi = entry.runtime_data.api
-    # Fetch all switches from the TIS API we only have one type here
-    switches: dict = await tis_api.get_entities(platform=Platform.SWITCH)
-    if switches:
-        # Prepare a list of tuples containing necessary switch details
-        switch_entities = [
-            (
-                appliance_name,
-                next(iter(appliance["channels"][0].values())),
-                appliance["device_id"],
-                appliance["is_protected"],
-                appliance["gateway"],
-            )
-            for switch in switches
-            for appliance_name, appliance in switch.items()
-        ]
-        # Create TISSwitch objects and add them to Home Assistant
-        try:
-            tis_switches = [
-                TISSwitch(tis_api, switch_name, channel_number, device_id, gateway)
-                for switch_name, channel_number, device_id, is_protected, gateway in switch_entities
-            ]
-            async_add_devices(tis_switches, update_before_add=True)
-        except Exception as e:
-            logging.error(f'error happened creating entities e: {e}')
+    # we only have one type of switches here
+    entry.runtime_data.appliances.async_setup_type(
+        Platform.SWITCH, build_switch, async_add_devices, update_before_add=True
+    )
+
+
+def build_switch(tis_api: TISApi, switch: Appliance) -> TISSwitch:
+    """Create the entity of a switch appliance."""
+    return TISSwitch(
+        tis_api, switch.name, switch.channels[0], switch.device_id, switch.gateway
+    )
 
 protocol_handler = TISProtocolHandler()
+SWITCH_FEEDBACK_TYPES = ("control_response", "binary_feedback", "update_response")
 
-class TISSwitch(SwitchEntity):
+class TISSwitch(TISEntityMixin, SwitchEntity):
     """Representation of a TIS switch."""
 
     def __init__(
@@ -74,104 +62,95 @@ class TISSwitch(SwitchEntity):
         self._attr_is_on = None
         self.name = switch_name
         self.device_id = device_id
+        self.device_address = pack_device_id(device_id)
         self.gateway = gateway
         self.channel_number = int(channel_number)
         self.listener: Callable | None = None
-        self.on_packet: TISPacket = protocol_handler.generate_control_on_packet(self)
-        self.off_packet: TISPacket = protocol_handler.generate_control_off_packet(self)
-        self.update_packet: TISPacket = protocol_handler.generate_control_update_packet(
-            self
-        )
+        self.update_packet: TISPacket = device_update_packet(self)
 
     async def async_added_to_hass(self) -> None:
         """Subscribe to events."""
 
         @callback
-        async def handle_event(event: Event):
+        def handle_event(event: Event) -> None:
             """Handle the event."""
-            # check if event is for this switch
-            if event.event_type == str(self.device_id):
-                if event.data["feedback_type"] == "control_response":
-                    channel_value = event.data["additional_bytes"][2]
-                    channel_number = event.data["channel_number"]
-                    if int(channel_number) == self.channel_number:
-                        self._state = (
-                            STATE_ON if int(channel_value) == 100 else STATE_OFF
-                        )
-                elif event.data["feedback_type"] == "binary_feedback":
-                    n_bytes = ceil(event.data["additional_bytes"][0] / 8)
-                    channels_status = "".join(
-                        int_to_8_bit_binary(event.data["additional_bytes"][i])
-                        for i in range(1, n_bytes + 1)
-                    )
-                    self._state = (
-                        STATE_ON
-                        if channels_status[self.channel_number - 1] == "1"
-                        else STATE_OFF
-                    )
-                elif event.data["feedback_type"] == "update_response":
-                    additional_bytes = event.data["additional_bytes"]
-                    channel_status = int(additional_bytes[self.channel_number])
-                    self._state = STATE_ON if channel_status > 0 else STATE_OFF
-                elif event.data["feedback_type"] == "offline_device":
-                    if int(event.data["channel_number"]) == self.channel_number:
-                        self._state = STATE_UNKNOWN
-
-            await self.async_update_ha_state(True)
-            # self.schedule_update_ha_state()
+            device_state = self.device_state
+            if event.data["feedback_type"] == "control_response":
+                channel_value = device_state.value(self.channel_number)
+                self._state = STATE_ON if channel_value == 100 else STATE_OFF
+                self.reconcile_feedback()
+            elif event.data["feedback_type"] in ("binary_feedback", "update_response"):
+                self._state = (
+                    STATE_ON if device_state.is_on(self.channel_number) else STATE_OFF
+                )
+                self.reconcile_feedback()
+
+            self.async_schedule_state_write()
 
         try:
-            self.listener = self.hass.bus.async_listen(MATCH_ALL, handle_event)
-            _ = await self.api.protocol.sender.send_packet(self.update_packet)
-        except e:
+            dispatcher = self.runtime_data.dispatcher
+            self.listener = dispatcher.async_subscribe(
+                self.device_address,
+                SWITCH_FEEDBACK_TYPES,
+                handle_event,
+                self.channel_number,
+            )
+            self.runtime_data.state_sync.async_request_update(
+                self.gateway, self.device_address, self.update_packet
+            )
+        except Exception as e:
             logging.error(f'error in async_added_to_hass fun e: {e}')
 
     async def async_will_remove_from_hass(self) -> None:
         """Remove the listener when the entity is removed."""
+        if self.listener is not None:
+            self.listener()
         self.listener = None
 
     async def async_turn_on(self, **kwargs: Any) -> None:
         """Turn the switch on."""
-
-        try:
-            ack_status = await self.api.protocol.sender.send_packet_with_ack(
-                self.on_packet,
-            )
-            if ack_status:
-                self._state = STATE_ON
-            elif ack_status == False:
-                self._state = STATE_UNKNOWN
-                event_data = {
-                    "device_id": self.device_id,
-                    "feedback_type": "offline_device",
-                    "channel_number": self.channel_number,
-                }
-                self.hass.bus.async_fire(str(self.device_id), event_data)
-        except e:
-            logging.error(f'error in async_turn_on e: {e}')
-        self.schedule_update_ha_state()
+        await self.async_set_state(True)
 
     async def async_turn_off(self, **kwargs: Any) -> None:
         """Turn the switch off."""
+        await self.async_set_state(False)
 
+    async def async_set_state(self, turn_on: bool) -> None:
+        """Switch the channel, writing the target upfront in optimistic mode."""
         try:
-            ack_status = await self.api.protocol.sender.send_packet_with_ack(
-                self.off_packet
+            if self.optimistic:
+                self.apply_state_ack(turn_on, True)
+                self.async_write_optimistic_state()
+            ack_status = await self.runtime_data.ack_tracker.send_packet_with_ack(
+                self.generate_state_packet(turn_on)
             )
-            if ack_status:
-                self._state = STATE_OFF
-            elif ack_status == False:
-                self._state = STATE_UNKNOWN
-                event_data = {
-                    "device_id": self.device_id,
-                    "feedback_type": "offline_device",
-                    "channel_number": self.channel_number,
-                }
-                self.hass.bus.async_fire(str(self.device_id), event_data)
-        except e:
-            logging.error(f'error in async_turn_off e: {e}')
+            self.reconcile_ack(ack_status)
+            self.apply_state_ack(turn_on, ack_status)
+        except Exception as e:
+            logging.error(f'error in async_set_state e: {e}')
         self.schedule_update_ha_state()
 
+    def state_snapshot(self) -> tuple:
+        """Return the attributes feedback can change."""
+        return (self._state,)
+
+    def optimistic_snapshot(self) -> tuple:
+        """Return the attributes an optimistic write is reconciled on."""
+        return (self._state,)
+
+    def generate_state_packet(self, turn_on: bool) -> TISPacket:
+        """Return the packet switching the channel on or off."""
+        if turn_on:
+            return protocol_handler.generate_control_on_packet(self)
+        return protocol_handler.generate_control_off_packet(self)
+
+    def apply_state_ack(self, turn_on: bool, ack_status: bool) -> None:
+        """Update the switch state from the ACK of a state packet."""
+        if ack_status:
+            self._state = STATE_ON if turn_on else STATE_OFF
+        elif ack_status == False:
+            self._state = STATE_UNKNOWN
+
     @property
     def name(self) -> str:
         """Return the name of the switch."""
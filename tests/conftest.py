@@ -0,0 +1,28 @@
+"""Fixtures for the TIS integration tests."""
+
+from __future__ import annotations
+
+import importlib.util
+from pathlib import Path
+import sys
+
+INTEGRATION_DIR = Path(__file__).parents[1]
+
+
+def _load_integration() -> None:
+    """Import the integration as the tishai package.
+
+    The integration lives at the root of the repository instead of under
+    custom_components, so it is imported from there by path.
+    """
+    spec = importlib.util.spec_from_file_location(
+        "tishai",
+        INTEGRATION_DIR / "__init__.py",
+        submodule_search_locations=[str(INTEGRATION_DIR)],
+    )
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+
+
+_load_integration()
@@ -0,0 +1,129 @@
+"""Tests for the pipelined ACK tracker."""
+
+from __future__ import annotations
+
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import Mock
+
+from tishai.ack_tracker import TISAckTracker, ack_key
+from tishai.gateways import SendPriority
+
+GATEWAY = "192.168.1.200"
+
+
+def _packet(channel: int) -> SimpleNamespace:
+    """Return a control packet for a channel of device 1,10."""
+    return SimpleNamespace(
+        device_id=[1, 10],
+        operation_code=[0x00, 0x31],
+        additional_bytes=[channel, 100, 0, 0],
+        destination_ip=GATEWAY,
+    )
+
+
+class FakeAckCoordinator:
+    """Hand out the ACK events the protocol sets when a reply arrives."""
+
+    def __init__(self) -> None:
+        """Initialize the coordinator."""
+        self.events: dict = {}
+
+    def create_ack_event(self, key) -> asyncio.Event:
+        """Create the event of a key."""
+        event = self.events[key] = asyncio.Event()
+        return event
+
+    def remove_ack_event(self, key) -> None:
+        """Drop the event of a key."""
+        self.events.pop(key, None)
+
+    def ack(self, packet: SimpleNamespace) -> None:
+        """Deliver the reply to a packet."""
+        self.events[ack_key(packet)].set()
+
+
+class FakeGatewaySender:
+    """Record the packets queued on the gateways."""
+
+    def __init__(self) -> None:
+        """Initialize the sender."""
+        self.sent: list[tuple[SimpleNamespace, SendPriority]] = []
+
+    def async_send(self, packet: SimpleNamespace, priority: SendPriority) -> None:
+        """Record a packet."""
+        self.sent.append((packet, priority))
+
+
+def _tracker(**kwargs) -> tuple[TISAckTracker, FakeAckCoordinator, FakeGatewaySender]:
+    """Return a tracker with a fake protocol, gateway sender and liveness."""
+    coordinator = FakeAckCoordinator()
+    gateways = FakeGatewaySender()
+    liveness = Mock()
+    liveness.is_available.return_value = True
+    api = SimpleNamespace(protocol=SimpleNamespace(coordinator=coordinator))
+    return TISAckTracker(api, gateways, liveness, **kwargs), coordinator, gateways
+
+
+async def _settle() -> None:
+    """Let the send tasks run until they wait for their ACK."""
+    for _ in range(10):
+        await asyncio.sleep(0)
+
+
+async def test_ack_resolves_its_own_packet() -> None:
+    """Test a reply only resolves the packet of its channel."""
+    tracker, coordinator, gateways = _tracker()
+    first = asyncio.create_task(tracker.send_packet_with_ack(_packet(1)))
+    second = asyncio.create_task(tracker.send_packet_with_ack(_packet(2)))
+    await _settle()
+    assert [priority for _, priority in gateways.sent] == [
+        SendPriority.CONTROL,
+        SendPriority.CONTROL,
+    ]
+
+    coordinator.ack(_packet(2))
+    assert await second is True
+    assert not first.done()
+
+    coordinator.ack(_packet(1))
+    assert await first is True
+    assert tracker.stats[GATEWAY]["acked"] == 2
+
+
+async def test_unanswered_packet_is_retried_then_fails() -> None:
+    """Test a packet without reply is retried, then reported as failed."""
+    tracker, _, gateways = _tracker(timeout=0.01, retries=2, backoff=0.001)
+    packet = _packet(1)
+
+    assert await tracker.send_packet_with_ack(packet) is False
+
+    assert gateways.sent == [
+        (packet, SendPriority.CONTROL),
+        (packet, SendPriority.RETRY),
+        (packet, SendPriority.RETRY),
+    ]
+    tracker.liveness.async_failed.assert_called_once_with(packet)
+    assert tracker.stats[GATEWAY]["failed"] == 1
+    assert tracker.stats[GATEWAY]["retries"] == 2
+
+
+async def test_window_limits_packets_in_flight() -> None:
+    """Test packets beyond the window wait for a slot."""
+    tracker, coordinator, gateways = _tracker(window=2)
+    tasks = [
+        asyncio.create_task(tracker.send_packet_with_ack(_packet(channel)))
+        for channel in (1, 2, 3)
+    ]
+    await _settle()
+    assert [packet.additional_bytes[0] for packet, _ in gateways.sent] == [1, 2]
+    assert tracker.stats[GATEWAY]["in_flight"] == 2
+    assert tracker.stats[GATEWAY]["queue_depth"] == 1
+
+    coordinator.ack(_packet(1))
+    await _settle()
+    assert [packet.additional_bytes[0] for packet, _ in gateways.sent] == [1, 2, 3]
+
+    coordinator.ack(_packet(2))
+    coordinator.ack(_packet(3))
+    assert await asyncio.gather(*tasks) == [True, True, True]
@@ -0,0 +1,110 @@
+"""Tests for the incremental appliance sync."""
+
+from __future__ import annotations
+
+from types import SimpleNamespace
+from typing import Any
+from unittest.mock import Mock, patch
+
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    MockEntityPlatform,
+)
+
+from homeassistant.core import HomeAssistant
+
+from tishai import TISEndPoint
+from tishai.appliances import TISApplianceSync
+from tishai.const import DOMAIN
+from tishai.cover import build_cover_w_pos
+from tishai.dispatcher import TISDispatcher
+from tishai.entities import WriteStats
+
+
+def _motor(device: int) -> dict[str, Any]:
+    """Return the parsed config of a motor on channel 1 of a device."""
+    return {
+        "device_id": [1, device],
+        "gateway": "192.168.1.200",
+        "channels": [{"channel_number": 1}],
+        "is_protected": False,
+    }
+
+
+class FakeApi:
+    """The parts of TISApi the appliance sync and the covers use."""
+
+    host = "0.0.0.0"
+
+    def __init__(self, hass: HomeAssistant, config_entries: dict[str, Any]) -> None:
+        """Initialize the API with already parsed appliances."""
+        self.hass = hass
+        self.config_entries = config_entries
+
+    async def get_entities(self) -> None:
+        """Keep the appliances the API was created with."""
+
+    async def parse_device_manager_request(self, data: dict[str, Any]) -> None:
+        """Take pushed data as already parsed appliances."""
+        self.config_entries = data
+
+
+async def test_removed_appliance_unsubscribes_its_entity(
+    hass: HomeAssistant,
+) -> None:
+    """Test removing an appliance drops its entity from the dispatcher."""
+    liveness = Mock()
+    liveness.is_available.return_value = True
+    dispatcher = TISDispatcher(hass, liveness)
+    entry = MockConfigEntry(domain=DOMAIN)
+    entry.add_to_hass(hass)
+    entry.runtime_data = SimpleNamespace(
+        dispatcher=dispatcher,
+        state_sync=Mock(),
+        liveness=liveness,
+        write_stats=WriteStats(),
+    )
+    platform = MockEntityPlatform(hass, domain="cover", platform_name=DOMAIN)
+    platform.config_entry = entry
+
+    def async_add_entities(entities, update_before_add=False):
+        hass.async_create_task(
+            platform.async_add_entities(entities, update_before_add)
+        )
+
+    api = FakeApi(hass, {"motor": [{"Kitchen": _motor(1)}, {"Hall": _motor(2)}]})
+    sync = TISApplianceSync(hass, api, entry.entry_id)
+    await sync.async_load()
+    sync.async_setup_type("motor", build_cover_w_pos, async_add_entities)
+    await hass.async_block_till_done()
+    assert {key[0] for key in dispatcher._subscribers} == {0x0101, 0x0102}
+
+    await sync.async_apply({"motor": [{"Hall": _motor(2)}]})
+    await hass.async_block_till_done()
+
+    assert sync.last_apply["removed"] == 1
+    assert {key[0] for key in dispatcher._subscribers} == {0x0102}
+    assert all(len(jobs) == 1 for jobs in dispatcher._subscribers.values())
+
+
+async def test_push_before_setup_is_loaded_by_the_setup(
+    hass: HomeAssistant,
+) -> None:
+    """Test a push to an entry that is not set up yet is kept for its setup."""
+    entry = MockConfigEntry(domain=DOMAIN)
+    entry.add_to_hass(hass)
+    api = FakeApi(hass, {})
+    api.get_entities = Mock(side_effect=UnboundLocalError)
+
+    sync = TISApplianceSync(hass, api, entry.entry_id)
+    await sync.async_load()
+    assert len(sync.catalogue) == 0
+
+    with patch.object(hass.config_entries, "async_reload") as mock_reload:
+        await TISEndPoint(api).apply_appliances({"motor": [{"Kitchen": _motor(1)}]})
+    mock_reload.assert_awaited_once_with(entry.entry_id)
+
+    sync = TISApplianceSync(hass, api, entry.entry_id)
+    await sync.async_load()
+    assert list(sync.catalogue.of_type("motor")) == ["Kitchen"]
+    api.get_entities.assert_called_once()
@@ -0,0 +1,79 @@
+"""Tests for device discovery and the device inventory."""
+
+from __future__ import annotations
+
+from datetime import UTC, datetime
+from types import SimpleNamespace
+from typing import Any
+from unittest.mock import patch
+
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+
+from tishai.const import DOMAIN
+from tishai.discovery import TISDeviceInventory
+
+
+class FakeGatewaySender:
+    """Answer every discovery broadcast like the protocol library does."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the sender."""
+        self.hass = hass
+        self.gateway = "192.168.1.200"
+
+    def async_broadcast(self, packet: Any) -> None:
+        """Deliver the reply of a dimmer on the current gateway."""
+        self.hass.loop.call_soon(
+            self._handle_discovery_feedback,
+            {"device_id": [1, 10], "device_type": [2, 88], "source_ip": self.gateway},
+        )
+
+    def _handle_discovery_feedback(self, info: dict[str, Any]) -> None:
+        """Append the reply only if its device is not listed yet."""
+        devices = self.hass.data[DOMAIN]["discovered_devices"]
+        if not any(device["device_id"] == info["device_id"] for device in devices):
+            devices.append(info)
+
+
+async def test_rescan_updates_known_device(hass: HomeAssistant) -> None:
+    """Test a known device replying again updates its gateway and last_seen."""
+    hass.data[DOMAIN] = {}
+    api = SimpleNamespace(hass=hass, domain=DOMAIN, devices_dict={(2, 88): "Dimmer"})
+    gateway_sender = FakeGatewaySender(hass)
+    inventory = TISDeviceInventory(hass, api, gateway_sender)
+    await inventory.async_load()
+    first = datetime(2026, 1, 1, tzinfo=UTC)
+    later = datetime(2026, 1, 2, tzinfo=UTC)
+
+    with (
+        patch("tishai.discovery.DISCOVERY_QUIET_TIME", 0.01),
+        patch.object(dt_util, "utcnow", return_value=first),
+    ):
+        assert [device async for device in inventory.async_scan()] == [
+            {
+                "device_id": [1, 10],
+                "device_type_code": [2, 88],
+                "device_type_name": "Dimmer",
+                "first_seen": first.isoformat(),
+                "gateway": "192.168.1.200",
+                "last_seen": first.isoformat(),
+            }
+        ]
+
+    gateway_sender.gateway = "192.168.1.201"
+    with (
+        patch("tishai.discovery.DISCOVERY_QUIET_TIME", 0.01),
+        patch.object(dt_util, "utcnow", return_value=later),
+    ):
+        devices = [device async for device in inventory.async_scan()]
+
+    assert len(devices) == 1
+    assert inventory.devices[(1, 10)] == {
+        "device_id": [1, 10],
+        "device_type_code": [2, 88],
+        "device_type_name": "Dimmer",
+        "first_seen": first.isoformat(),
+        "gateway": "192.168.1.201",
+        "last_seen": later.isoformat(),
+    }
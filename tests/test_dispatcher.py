@@ -0,0 +1,164 @@
+"""Tests for the feedback dispatcher and the device state cache."""
+
+from __future__ import annotations
+
+from typing import Any
+from unittest.mock import Mock
+
+from homeassistant.core import Event, HomeAssistant, callback
+
+from tishai.dispatcher import TISDispatcher, decode_binary_feedback
+
+DEVICE = [1, 10]
+DEVICE_ADDRESS = 0x010A
+
+
+def _dispatcher(hass: HomeAssistant) -> TISDispatcher:
+    """Return a dispatcher listening on the bus."""
+    liveness = Mock()
+    liveness.async_seen.return_value = False
+    dispatcher = TISDispatcher(hass, liveness)
+    dispatcher.async_setup()
+    return dispatcher
+
+
+def _subscribe(
+    dispatcher: TISDispatcher,
+    device_address: int,
+    feedback_type: str,
+    channel_number: int | None = None,
+) -> list[Event]:
+    """Subscribe to feedback, return the list the events are recorded in."""
+    events: list[Event] = []
+
+    @callback
+    def handle_event(event: Event) -> None:
+        events.append(event)
+
+    dispatcher.async_subscribe(
+        device_address, (feedback_type,), handle_event, channel_number
+    )
+    return events
+
+
+async def _fire(hass: HomeAssistant, data: dict[str, Any]) -> None:
+    """Fire a TIS feedback event and let the handlers run."""
+    hass.bus.async_fire("tis_feedback", data)
+    await hass.async_block_till_done()
+
+
+def test_decode_binary_feedback_is_lsb_first() -> None:
+    """Test bit n of each byte holds channel 8 * byte + n + 1."""
+    assert decode_binary_feedback([10, 0b00000101, 0b00000010]) == 0b1000000101
+
+
+async def test_feedback_only_reaches_its_device_and_channel(
+    hass: HomeAssistant,
+) -> None:
+    """Test a control_response wakes its channel and device-wide handlers."""
+    dispatcher = _dispatcher(hass)
+    channel_1 = _subscribe(dispatcher, DEVICE_ADDRESS, "control_response", 1)
+    channel_2 = _subscribe(dispatcher, DEVICE_ADDRESS, "control_response", 2)
+    every_channel = _subscribe(dispatcher, DEVICE_ADDRESS, "control_response")
+    other_device = _subscribe(dispatcher, 0x010B, "control_response", 1)
+    other_type = _subscribe(dispatcher, DEVICE_ADDRESS, "binary_feedback", 1)
+
+    await _fire(
+        hass,
+        {
+            "device_id": DEVICE,
+            "feedback_type": "control_response",
+            "channel_number": 1,
+            "additional_bytes": [1, 0xF8, 80],
+        },
+    )
+
+    assert len(channel_1) == 1
+    assert len(every_channel) == 1
+    assert not channel_2
+    assert not other_device
+    assert not other_type
+    state = dispatcher.device_state(DEVICE_ADDRESS)
+    assert state.value(1) == 80
+    assert state.is_on(1)
+
+
+async def test_update_response_reports_every_channel(hass: HomeAssistant) -> None:
+    """Test an update_response stores every channel and wakes each of them."""
+    dispatcher = _dispatcher(hass)
+    channels = {
+        channel_number: _subscribe(
+            dispatcher, DEVICE_ADDRESS, "update_response", channel_number
+        )
+        for channel_number in (1, 2, 3)
+    }
+
+    await _fire(
+        hass,
+        {
+            "device_id": DEVICE,
+            "feedback_type": "update_response",
+            "additional_bytes": [3, 0, 50, 100],
+        },
+    )
+
+    assert all(len(events) == 1 for events in channels.values())
+    state = dispatcher.device_state(DEVICE_ADDRESS)
+    assert [state.value(channel_number) for channel_number in (1, 2, 3)] == [0, 50, 100]
+    assert [n for n in (1, 2, 3) if state.is_on(n)] == [2, 3]
+
+
+async def test_binary_feedback_only_reaches_changed_channels(
+    hass: HomeAssistant,
+) -> None:
+    """Test binary_feedback wakes the channels whose on/off state changed."""
+    dispatcher = _dispatcher(hass)
+    channels = {
+        channel_number: _subscribe(
+            dispatcher, DEVICE_ADDRESS, "binary_feedback", channel_number
+        )
+        for channel_number in (1, 2, 3, 10)
+    }
+    feedback = {"device_id": DEVICE, "feedback_type": "binary_feedback"}
+
+    await _fire(hass, feedback | {"additional_bytes": [10, 0b00000101, 0b00000010]})
+
+    # the first report is new for every channel
+    assert all(len(events) == 1 for events in channels.values())
+    state = dispatcher.device_state(DEVICE_ADDRESS)
+    assert [n for n in range(1, 11) if state.is_on(n)] == [1, 3, 10]
+
+    await _fire(hass, feedback | {"additional_bytes": [10, 0b00000001, 0b00000010]})
+
+    assert {
+        channel_number: len(events) for channel_number, events in channels.items()
+    } == {1: 1, 2: 1, 3: 2, 10: 1}
+    assert [n for n in range(1, 11) if state.is_on(n)] == [1, 10]
+
+
+async def test_unsubscribed_handler_is_not_called(hass: HomeAssistant) -> None:
+    """Test an unsubscribed handler leaves the index and gets no feedback."""
+    dispatcher = _dispatcher(hass)
+    events: list[Event] = []
+
+    @callback
+    def handle_event(event: Event) -> None:
+        events.append(event)
+
+    unsubscribe = dispatcher.async_subscribe(
+        DEVICE_ADDRESS, ("control_response", "update_response"), handle_event, 1
+    )
+
+    unsubscribe()
+    await _fire(
+        hass,
+        {
+            "device_id": DEVICE,
+            "feedback_type": "control_response",
+            "channel_number": 1,
+            "additional_bytes": [1, 0xF8, 80],
+        },
+    )
+
+    assert not events
+    assert not dispatcher._subscribers
@@ -0,0 +1,82 @@
+"""Tests for the per-gateway send queues."""
+
+from __future__ import annotations
+
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from homeassistant.core import HomeAssistant
+
+from tishai.gateways import SendPriority, TISGatewaySender
+
+GATEWAY = "192.168.1.200"
+
+
+class FakeSender:
+    """Record the packets the protocol sends."""
+
+    def __init__(self) -> None:
+        """Initialize the sender."""
+        self.sent: list[str] = []
+
+    async def send_packet(self, packet: SimpleNamespace) -> None:
+        """Record a packet."""
+        self.sent.append(packet.name)
+
+    async def broadcast_packet(self, packet: SimpleNamespace) -> None:
+        """Record a broadcast."""
+        self.sent.append(packet.name)
+
+
+def _packet(name: str) -> SimpleNamespace:
+    """Return a named packet for the gateway."""
+    return SimpleNamespace(name=name, destination_ip=GATEWAY)
+
+
+async def test_control_goes_before_queued_background_traffic(
+    hass: HomeAssistant,
+) -> None:
+    """Test a control packet is sent before the packets queued before it."""
+    sender = FakeSender()
+    gateway_sender = TISGatewaySender(
+        hass, SimpleNamespace(protocol=SimpleNamespace(sender=sender))
+    )
+    intervals = {priority: 0.0 for priority in SendPriority}
+    with patch.dict("tishai.gateways._CLASS_INTERVALS", intervals):
+        gateway_sender.async_send(_packet("discovery"), SendPriority.DISCOVERY)
+        gateway_sender.async_send(_packet("poll"), SendPriority.POLL)
+        gateway_sender.async_send(_packet("state sync"), SendPriority.STATE_SYNC)
+        gateway_sender.async_send(_packet("control"), SendPriority.CONTROL)
+        await hass.async_block_till_done(wait_background_tasks=True)
+
+    assert sender.sent == ["control", "state sync", "poll", "discovery"]
+    assert gateway_sender.stats[GATEWAY]["sent"] == {
+        "control": 1,
+        "state_sync": 1,
+        "poll": 1,
+        "discovery": 1,
+    }
+
+
+async def test_background_traffic_waits_for_a_quiet_gateway(
+    hass: HomeAssistant,
+) -> None:
+    """Test a poll waits until the gateway was quiet for its interval."""
+    sender = FakeSender()
+    gateway_sender = TISGatewaySender(
+        hass, SimpleNamespace(protocol=SimpleNamespace(sender=sender))
+    )
+    intervals = {priority: 0.0 for priority in SendPriority}
+    intervals[SendPriority.POLL] = 0.1
+    with patch.dict("tishai.gateways._CLASS_INTERVALS", intervals):
+        gateway_sender.async_send(_packet("control 1"), SendPriority.CONTROL)
+        gateway_sender.async_send(_packet("poll"), SendPriority.POLL)
+        await asyncio.sleep(0.01)
+        # the poll only goes out 0.1 seconds after the first control packet,
+        # so a control packet queued meanwhile overtakes it
+        assert sender.sent == ["control 1"]
+        gateway_sender.async_send(_packet("control 2"), SendPriority.CONTROL)
+        await hass.async_block_till_done(wait_background_tasks=True)
+
+    assert sender.sent == ["control 1", "control 2", "poll"]
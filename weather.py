@@ -35,7 +35,6 @@ from homeassistant.components.weather import (
 )
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import (
-    MATCH_ALL,
     CONF_LATITUDE,
     CONF_LONGITUDE,
     CONF_NAME,
@@ -51,6 +50,9 @@ from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.event import async_track_time_interval
 
 from . import TISConfigEntry
+from .dispatcher import pack_device_id
+from .entities import TISEntityMixin
+from .gateways import SendPriority
 
 handler = TISProtocolHandler()
 
@@ -67,13 +69,14 @@ async def async_setup_entry(
     async_add_devices(weather_entities, update_before_add=True)
 
 
-class TISWeatherStation(WeatherEntity):
+class TISWeatherStation(TISEntityMixin, WeatherEntity):
     """Representation of a weather condition."""
 
     def __init__(self, api: TISApi, device_id: list, gateway) -> None:
         """Initialize the weather entity."""
         self.api = api
         self.device_id = device_id
+        self.device_address = pack_device_id(device_id)
         self.gateway = gateway
         self.update_packet = handler.generate_weather_update_packet(self)
         self.listener = None
@@ -90,34 +93,40 @@ class TISWeatherStation(WeatherEntity):
 
         @callback
         def handle_event(event: Event):
-            if event.event_type == str(self.device_id):
-                if event.data["feedback_type"] == "weather_feedback":
-                    #     """
-                    #             "wind": wind_direction,
-                    #             "temperature": temperature,
-                    #             "humidity": humidity,
-                    #             "wind_speed": wind_speed,
-                    #             "gust_speed": gust_speed,
-                    #             "rainfall": rainfall,
-                    #             "lighting": lighting,
-                    #             "uv": uv,"""
-                    # update attributes
-                    self._attr_uv_index = float(event.data["uv"])
-                    self._attr_native_temperature = event.data["temperature"]
-                    logging.error("event data %s", event.data)
+            #     """
+            #             "wind": wind_direction,
+            #             "temperature": temperature,
+            #             "humidity": humidity,
+            #             "wind_speed": wind_speed,
+            #             "gust_speed": gust_speed,
+            #             "rainfall": rainfall,
+            #             "lighting": lighting,
+            #             "uv": uv,"""
+            # update attributes
+            self._attr_uv_index = float(event.data["uv"])
+            self._attr_native_temperature = event.data["temperature"]
+            logging.error("event data %s", event.data)
             self.schedule_update_ha_state()
 
-        self.listener = self.hass.bus.async_listen(MATCH_ALL, handle_event)
+        dispatcher = self.runtime_data.dispatcher
+        self.listener = dispatcher.async_subscribe(
+            self.device_address, ("weather_feedback",), handle_event
+        )
+        self.async_set_probe(self.update_packet)
 
     async def async_will_remove_from_hass(self) -> None:
         """Remove the listener when the entity is removed."""
+        if self.listener is not None:
+            self.listener()
         self.listener = None
 
     # send update packet to get initial state
 
     async def async_update(self, *args, **kwargs) -> None:
         """Get the latest data from Buienradar."""
-        await self.api.protocol.sender.send_packet(self.update_packet)
+        self.runtime_data.gateway_sender.async_send(
+            self.update_packet, SendPriority.POLL
+        )
 
     @property
     def name(self) -> str: